@@ -1,9 +1,11 @@
 import random
 import math
+from collections import deque
 
+import numpy as np
 import pygame
 
-from utils import ANIMATION_PATHS_LINGERING_TIME, Vec2, linspace
+from utils import ANIMATION_MAX_CURVES, ANIMATION_PATHS_LINGERING_TIME, Vec2, linspace
 
 
 def get_random_color():
@@ -27,6 +29,21 @@ class Bezier:
     def __call__(self, t: float) -> Vec2:
         return self.p[0] * (1-t)**3 + self.p[1] * 3 * (1-t)**2 * t + self.p[2] * 3 * (1-t) * t**2 + self.p[3] * t**3
 
+    def sample(self, basis: np.ndarray) -> np.ndarray:
+        '''
+        Points of the curve at all the parameters of the basis at once, shape (len(basis), 2)
+        :param basis - bernstein_basis of the parameters
+        '''
+        return basis @ np.array([p.astuple() for p in self.p])
+
+
+def bernstein_basis(t: list[float]) -> np.ndarray:
+    '''
+    Weights of the four control points for every parameter in t, shape (len(t), 4)
+    '''
+    t = np.asarray(t, dtype=float)[:, None]
+    return np.hstack([(1-t)**3, 3 * (1-t)**2 * t, 3 * (1-t) * t**2, t**3])
+
 def get_random_p1_p2(p0: Vec2, p3: Vec2) -> tuple[Vec2, Vec2]:
     '''
     Get random intermediate points for the Bezier curve
@@ -62,28 +79,60 @@ def get_curves(g, node_index: int, give: bool) -> list[Bezier]:
 
 
 class Animation:
-    def __init__(self) -> None:
+    '''
+    Paths are animated in batches: all the curves added within one frame (e.g. the moves of an auto-solve)
+    start together, share a colour and a path along the same edge in the same direction is only drawn once.
+    At most max_curves paths are kept, the faded out ones are dropped
+    '''
+    def __init__(self, max_curves: int = ANIMATION_MAX_CURVES) -> None:
         self.CURVE_RESOLUTION = 120
         self.linear_t = linspace(0, 1, self.CURVE_RESOLUTION)
-        self.processes = []
+        # the curves are sampled once, when they are added
+        self.basis = bernstein_basis(self.linear_t)
+        self.max_curves = max_curves
+        self.processes = deque() # [t, points of shape (curves, CURVE_RESOLUTION, 2), color], the oldest first
+        self.num_curves = 0
+        self.pending = {} # (start, end): curve, added since the last tick
         self.accumulated_time = 0
     
     def add_curves(self, curves: list[Bezier]):
-        color = get_random_color()
         for curve in curves:
-            self.processes.append(
-                [0, curve, color]
-            )
+            self.pending[(curve.p[0].astuple(), curve.p[3].astuple())] = curve
+
+    def _start_pending(self):
+        curves = list(self.pending.values())[-self.max_curves:]
+        self.pending.clear()
+        if not curves:
+            return
+        self.processes.append(
+            [0, np.stack([curve.sample(self.basis) for curve in curves]), get_random_color()]
+        )
+        self.num_curves += len(curves)
+        # over the limit: the oldest paths make room
+        while self.num_curves > self.max_curves:
+            process = self.processes[0]
+            excess = self.num_curves - self.max_curves
+            if excess >= len(process[1]):
+                self.processes.popleft()
+                self.num_curves -= len(process[1])
+            else:
+                process[1] = process[1][excess:]
+                self.num_curves -= excess
     
     def tick(self):
-        for i, process in enumerate(self.processes):
+        self._start_pending()
+        end = self.CURVE_RESOLUTION * ANIMATION_PATHS_LINGERING_TIME
+        for process in self.processes:
             process[0] += 2
-            if self.CURVE_RESOLUTION < process[0] <= self.CURVE_RESOLUTION * ANIMATION_PATHS_LINGERING_TIME:
-                self.processes[i][2] = fade_color(self.processes[i][2])
+            if self.CURVE_RESOLUTION < process[0] <= end:
+                process[2] = fade_color(process[2])
+        # the ones that faded out are done (all batches move at the same pace, so they are the oldest)
+        while self.processes and self.processes[0][0] > end:
+            self.num_curves -= len(self.processes.popleft()[1])
 
-        
     def draw(self, surface):
-        for t, curve, color in self.processes:
-            if t <= self.CURVE_RESOLUTION * ANIMATION_PATHS_LINGERING_TIME:
-                for t_ in range(min(t, self.CURVE_RESOLUTION)):
-                    pygame.draw.circle(surface, color, curve(self.linear_t[t_]).astuple(), 1)
+        for t, points, color in self.processes:
+            n = min(t, self.CURVE_RESOLUTION)
+            if n > 1:
+                for curve in points:
+                    pygame.draw.lines(surface, color, False, curve[:n], 2)
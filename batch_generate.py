@@ -0,0 +1,136 @@
+'''
+Headless batch generation of puzzles. Candidates are generated and solved exactly in a pool of worker
+processes, the ones whose minimum number of moves falls into the wanted band are saved to the game store
+(and their solution to the solution cache, so they open with the best score at hand).
+
+usage: python batch_generate.py 100 --nodes 8 --bank-minus-genus 1 --moves 8 15 --workers 4 --seed 0
+'''
+import argparse
+import multiprocessing
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from engine import LaplacianEngine
+from generation import random_game
+from solvers import Budget, run_solver
+
+
+def make_candidate(number_of_nodes, bank_minus_genus, density, display_layout, move_range, seconds, seed):
+    '''
+    One random game and its exact solution; returns (graph in the game file layout, engine, result, accepted)
+    '''
+    rng = np.random.default_rng(seed)
+    G, values, positions = random_game(number_of_nodes, bank_minus_genus, display_layout, density, rng)
+    engine = LaplacianEngine(range(number_of_nodes), G.edges, values)
+    result = run_solver(engine, 'exact', budget=Budget(seconds), rng=random.Random(int(seed.generate_state(1)[0])))
+    low, high = move_range
+    # a solution that is not proven optimal only bounds the difficulty from above
+    accepted = result.status == 'optimal' and low <= result.num_moves <= high
+    graph = {
+        'edges': [list(e) for e in G.edges],
+        'values': dict(enumerate(values)),
+        'positions': positions
+    }
+    return graph, engine, result, accepted
+
+
+class BatchStats:
+    def __init__(self, workers):
+        self.workers = workers
+        self.start = perf_counter()
+        self.candidates = 0
+        self.accepted = 0
+        self.not_proven = 0
+
+    @property
+    def elapsed(self):
+        return perf_counter() - self.start
+
+    def report(self):
+        rate = self.accepted / self.elapsed
+        return (f'{self.accepted} games out of {self.candidates} candidates '
+                f'({self.not_proven} not solved within the time limit) in {self.elapsed:.1f} s: '
+                f'{rate:.2f} games/s, {rate / self.workers:.2f} games/s per core, '
+                f'{self.candidates / self.elapsed / self.workers:.2f} candidates/s per core')
+
+
+def generate_batch(number, number_of_nodes, bank_minus_genus=0, move_range=(0, float('inf')), density=0.25,
+                   display_layout='planar', seconds=5, workers=None, seed=None, max_candidates=None, stats=None):
+    '''
+    Yields (graph, engine, result) for `number` games in the difficulty band as they are found.
+    Candidates are taken in the order they were submitted (not as they finish), each with its own seed,
+    so a fixed seed always gives the same games.
+    :param move_range - (low, high), the accepted minimum numbers of moves
+    :param seconds - time limit of the exact solver for one candidate
+    :param max_candidates - gives up after that many candidates (default 100 per wanted game)
+    :param stats - BatchStats to count into
+    '''
+    workers = workers or os.cpu_count()
+    max_candidates = max_candidates or 100 * number
+    stats = stats or BatchStats(workers)
+    seeds = np.random.SeedSequence(seed)
+    args = (number_of_nodes, bank_minus_genus, density, display_layout, tuple(move_range), seconds)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        try:
+            while stats.accepted < number:
+                # keep every worker busy, but do not run far ahead of what is needed
+                while len(pending) < 2 * workers and stats.candidates + len(pending) < max_candidates:
+                    pending.append(executor.submit(make_candidate, *args, seeds.spawn(1)[0]))
+                if not pending:
+                    break
+                graph, engine, result, accepted = pending.popleft().result()
+                stats.candidates += 1
+                stats.not_proven += result.status != 'optimal'
+                if accepted:
+                    stats.accepted += 1
+                    yield graph, engine, result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generates puzzles of a given difficulty into the game store.')
+    parser.add_argument('number', type=int, help='how many games to add')
+    parser.add_argument('--nodes', type=int, default=8)
+    parser.add_argument('--bank-minus-genus', type=int, default=0)
+    parser.add_argument('--moves', type=int, nargs=2, default=(0, 10**9), metavar=('MIN', 'MAX'),
+                        help='the band of the minimum number of moves')
+    parser.add_argument('--density', type=float, default=0.25, help='see generation.random_connected_graph')
+    parser.add_argument('--layout', choices=['planar', 'shell'], default='planar')
+    parser.add_argument('--seconds', type=float, default=5, help='solver time limit per candidate')
+    parser.add_argument('--workers', type=int, default=None, help='default: the number of cores')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help='only report, do not save')
+    args = parser.parse_args()
+
+    # the ui modules are only needed here, in the parent process
+    from solution_cache import remember
+    from storage import game_filename
+    from utils import get_store
+
+    # a dry run leaves the disk alone: opening the store would create games.db (and import games/)
+    store = None if args.dry_run else get_store()
+    stats = BatchStats(args.workers or os.cpu_count())
+    for graph, engine, result in generate_batch(
+            args.number, args.nodes, args.bank_minus_genus, args.moves, args.density, args.layout,
+            args.seconds, args.workers, args.seed, stats=stats):
+        if args.dry_run:
+            print(f'{result.num_moves} moves')
+            continue
+        info = {'date_created': datetime.now().strftime("%d/%m/%Y %H:%M:%S"), 'note': 'generated'}
+        number = store.add_game(graph, info)
+        remember(engine, result, 'exact')
+        print(f'{game_filename(number)}: {result.num_moves} moves')
+    print(stats.report())
+
+
+if __name__ == '__main__':
+    main()
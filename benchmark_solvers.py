@@ -0,0 +1,80 @@
+'''
+Solver benchmark on the games of a folder in the games/ layout: for every strategy, the number of moves
+found per game and the time it took, next to the exact minimum where the exact solver proves it in time.
+
+usage: python benchmark_solvers.py --strategies random greedy beam astar --restarts 10 --seed 0
+('astar' is a single run, --restarts does not apply to it)
+'''
+import argparse
+import json
+import os
+import random
+from time import perf_counter
+
+from engine import LaplacianEngine
+from solvers import ASTAR_MAX_STATES, Budget, is_winnable, run_solver
+
+
+def load_engines(directory):
+    '''
+    (filename, engine) of the winnable games of a folder, in the order of their numbers
+    '''
+    games = []
+    filenames = sorted((el for el in os.listdir(directory) if el.endswith('.json')), key=lambda el: int(el[:-5]))
+    for filename in filenames:
+        with open(os.path.join(directory, filename), 'r') as f:
+            graph = json.load(f)['graph']
+        nodes = sorted(graph['values'], key=int)
+        engine = LaplacianEngine([int(node) for node in nodes], [tuple(e) for e in graph['edges']],
+                                 [graph['values'][node] for node in nodes])
+        if is_winnable(engine):
+            games.append((filename, engine))
+    return games
+
+
+def run(engine, strategy, restarts, seconds, seed, width, max_states=ASTAR_MAX_STATES):
+    start = perf_counter()
+    result = run_solver(engine, strategy, restarts=restarts, budget=Budget(seconds), rng=random.Random(seed),
+                        width=width, max_states=max_states)
+    return result, perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares the solver strategies on a folder of games.')
+    parser.add_argument('--games', default='games', help='a folder in the games/ layout')
+    parser.add_argument('--strategies', nargs='+', default=['random', 'greedy', 'beam', 'astar'])
+    parser.add_argument('--restarts', type=int, default=10, help='runs per game and strategy')
+    parser.add_argument('--width', type=lambda value: value if value == 'all' else int(value), default=None,
+                        help="beam width (default: the one of the strategy; 'all': whole layers, astar only)")
+    parser.add_argument('--max-states', type=int, default=ASTAR_MAX_STATES, help='memory limit of astar')
+    parser.add_argument('--seconds', type=float, default=None, help='time limit per game and strategy')
+    parser.add_argument('--exact-seconds', type=float, default=10, help='time limit of the exact solver (0: skip it)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    games = load_engines(args.games)
+    optimum = {}
+    if args.exact_seconds:
+        for filename, engine in games:
+            result, _ = run(engine, 'exact', args.restarts, args.exact_seconds, args.seed, args.width)
+            if result.status == 'optimal':
+                optimum[filename] = result.num_moves
+
+    print(f'{len(games)} games, {len(optimum)} with a proven optimum; {args.restarts} runs per game')
+    print(f'{"strategy":>10} {"moves":>7} {"optimal":>8} {"over opt.":>9} {"ms/game":>9}')
+    for strategy in args.strategies:
+        moves = seconds = found_optimal = over = 0
+        for filename, engine in games:
+            result, elapsed = run(engine, strategy, args.restarts, args.seconds, args.seed, args.width,
+                                  args.max_states)
+            moves += result.num_moves
+            seconds += elapsed
+            if filename in optimum:
+                found_optimal += result.num_moves == optimum[filename]
+                over += result.num_moves - optimum[filename]
+        print(f'{strategy:>10} {moves / len(games):7.2f} {found_optimal:>4}/{len(optimum):<3} '
+              f'{over / max(len(optimum), 1):9.2f} {seconds / len(games) * 1000:9.2f}')
+
+
+if __name__ == '__main__':
+    main()
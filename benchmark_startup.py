@@ -0,0 +1,83 @@
+'''
+Startup benchmark: starts the game the way main.py does in a fresh interpreter under `python -X importtime`
+and stops it as soon as the menu has presented its first frame. Reports the time to the first frame
+(from launching the interpreter) and the modules that took the longest to import before it.
+
+usage: python benchmark_startup.py --runs 5 --top 15
+'''
+import argparse
+import os
+import subprocess
+import sys
+import time
+from statistics import median
+
+
+# the body of main.py, with the first presented frame ending the process
+CHILD = '''
+import sys, time
+import pygame_setup
+update = pygame_setup.renderer.update
+def first_frame():
+    update()
+    print('FIRST_FRAME', time.time(), flush=True)
+    sys.exit(0)
+pygame_setup.renderer.update = first_frame
+from windows.menu import MenuWindow
+from sfx import play_bg_music
+play_bg_music()
+MenuWindow()
+'''
+
+
+def run_once(importtime=False):
+    '''
+    Seconds from launching the interpreter to the first frame and the stderr of the run
+    '''
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD]
+    start = time.time()
+    process = subprocess.run(command, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    for line in process.stdout.splitlines():
+        if line.startswith('FIRST_FRAME'):
+            return float(line.split()[1]) - start, process.stderr
+    raise RuntimeError(f'The menu did not show up:\n{process.stderr}')
+
+
+def parse_importtime(stderr):
+    '''
+    [(level, cumulative microseconds, module)] of the top-level modules and packages (and the windows)
+    in the order they finished importing; a module imported by another one is counted in both
+    '''
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # the nesting level is the indentation of the name
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if '.' not in name or name.startswith('windows.'):
+            modules.append((level, int(cumulative), name))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the time to the first frame of the menu.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='how many of the slowest imports to list')
+    args = parser.parse_args()
+
+    run_once() # warms up the disk cache and the bytecode
+    times = [run_once()[0] for _ in range(args.runs)]
+    print(f'time to first frame: median {median(times) * 1000:.0f} ms '
+          f'(min {min(times) * 1000:.0f}, max {max(times) * 1000:.0f}, {args.runs} runs)')
+
+    _, stderr = run_once(importtime=True)
+    modules = parse_importtime(stderr)
+    print(f'imported before the first frame: {sum(t for level, t, _ in modules if level == 0) / 1000:.0f} ms, slowest:')
+    for _, cumulative, name in sorted(modules, key=lambda module: -module[1])[:args.top]:
+        print(f'{cumulative / 1000:8.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,8 @@
 import os
-import json
 from datetime import datetime
 from pprint import pprint
-from graph import collapse_moves, load_game, show_instruction, find_best
-from utils import ALLOWED_SYMBOLS, assemble_games_dataframe, best_solution_by_player
+from graph import load_game, show_instruction, solve_games, solve_within
+from utils import ALLOWED_SYMBOLS, assemble_games_dataframe, best_collapsed_solution_by_player, get_store
 
 
 # --- command handling
@@ -71,9 +70,9 @@ class Commands:
         game_number = Commands.to_integer(params[0])
         if isinstance(game_number, str):
             return game_number
-        myfile = f'games/{game_number}.json'
-        if os.path.isfile(myfile):
-            os.remove(myfile)
+        store = get_store()
+        if store.exists(game_number):
+            store.delete(game_number)
             return (f'game #{game_number} has been deleted')
         else:
             return (f'[ERROR] game #{game_number} does not exist')
@@ -97,15 +96,10 @@ class Commands:
         game_number = Commands.to_integer(params[0])
         if isinstance(game_number, str):
             return game_number
-        myfile = f'games/{game_number}.json'
-        if os.path.isfile(myfile):
-            with open(myfile, 'r') as f:
-                game = json.load(f)
-            if game['plays']:
-                prev_len = len(game['plays'])
-                game['plays'] = []
-                with open(myfile, 'w') as f:
-                    json.dump(game, f)
+        store = get_store()
+        if store.exists(game_number):
+            prev_len = store.reset(game_number)
+            if prev_len:
                 return f'game #{game_number} has been reset & (deleted {prev_len} attempts)'
             else:
                 return f'[ERROR] game #{game_number} has never been solved'
@@ -117,18 +111,16 @@ class Commands:
         if isinstance(game_number, str):
             return game_number
 
-        myfile = f'games/{game_number}.json'
-        if os.path.isfile(myfile):
-            with open(myfile, 'r') as f:
-                game = json.load(f)
+        store = get_store()
+        if store.exists(game_number):
+            info = store.game(game_number)['info']
             new_note = params[1]
             if new_note != '_':
-                game['info']['note'] = new_note
+                info['note'] = new_note
             if '-newdate' in options:
-                game['info']['date_created'] = datetime.now().strftime(
+                info['date_created'] = datetime.now().strftime(
                     "%d/%m/%Y %H:%M:%S")
-            with open(myfile, 'w') as f:
-                json.dump(game, f)
+            store.set_info(game_number, info)
             return f'game #{game_number} data has been changed'
         else:
             return f'[ERROR] game #{game_number} does not exist'
@@ -141,20 +133,28 @@ class Commands:
         df = assemble_games_dataframe()
         col = ['number', 'nodes', 'edges', 'bank', 'best_by_player', 'best_by_player_collapsed',
                'solution_by_player', 'best_by_algo', 'solution_by_algo']
-        find_best_N = 200
+        solver_seconds = 5
         res = [col]
-        for game in df:
+        # the games are independent, so they are solved all at once over the cores
+        results = solve_games([load_game(f'{game["game_number"]}.json') for game in df], seconds=solver_seconds,
+                              use_cache=True)
+        for game, result in zip(df, results):
             tmp = [str(game['game_number']), str(game['graph']
                    [0]), str(game['graph'][1]), str(game['bank'])]
             filename = f'{tmp[0]}.json'
-            g = load_game(filename)
-            moves_best, best_by_algo = find_best(g, N=find_best_N)
-            solution_by_algo = ' '.join(show_instruction(moves_best))
-            solution_by_player_noncollapsed, best_by_player = best_solution_by_player(
+            moves_best, best_by_algo = result.moves, result.num_moves
+            if moves_best is not None:
+                solution_by_algo = ' '.join(show_instruction(moves_best))
+                if result.status != 'optimal':
+                    best_by_algo = f'{best_by_algo} ({result.status})'
+            else:
+                best_by_algo = 'not winnable'
+                solution_by_algo = 'none'
+            # the header of the stored play has both numbers, the moves themselves are not decoded
+            solution_by_player_collapsed, best_by_player = best_collapsed_solution_by_player(
                 filename)
-            if solution_by_player_noncollapsed is not None:
-                solution_by_player_collapsed, best_by_player_collapsed = collapse_moves(
-                    solution_by_player_noncollapsed)
+            if solution_by_player_collapsed is not None:
+                best_by_player_collapsed = sum([abs(num) for num in solution_by_player_collapsed.values()])
                 solution_by_player = ' '.join(
                     show_instruction(solution_by_player_collapsed))
             else:
@@ -180,19 +180,21 @@ class Commands:
         if isinstance(game_number, str):
             return game_number
         myfile = f'{game_number}.json'
-        if os.path.isfile(f'games/{myfile}'):
+        if get_store().exists(game_number):
             if '-algo' in options:
                 g = load_game(myfile)
-                moves_best, min_num_moves = find_best(g, N=1000)
+                result = solve_within(g, seconds=30, use_cache=True)
+                if result.moves is None:
+                    return f'[ERROR] game #{game_number} is not winnable'
                 moves_str = Commands.special_join(
-                    show_instruction(moves_best, arrows=False))
-                return f'(by the algorithm) game #{game_number}& collapsed number of moves: {min_num_moves}, &{moves_str}'
+                    show_instruction(result.moves, arrows=False))
+                optimality = 'optimal' if result.status == 'optimal' else f'not proven optimal ({result.status})'
+                return f'(by the algorithm) game #{game_number}& collapsed number of moves: {result.num_moves}, &{optimality}, &{moves_str}'
             else:
-                best_solution_player, min_number = best_solution_by_player(
+                best_play_collapsed, _ = best_collapsed_solution_by_player(
                     myfile)
-                if best_solution_player is not None:
-                    best_play_collapsed, min_num_collapsed = collapse_moves(
-                        best_solution_player)
+                if best_play_collapsed is not None:
+                    min_num_collapsed = sum([abs(num) for num in best_play_collapsed.values()])
                     best_play_instruction = show_instruction(
                         best_play_collapsed, arrows=False)
                     best_play_moves_str = Commands.special_join(
@@ -203,9 +205,23 @@ class Commands:
         else:
             return f'[ERROR] game #{game_number} does not exist'
 
+    def export_games(params, options):
+        directory = params[0]
+        if os.path.isdir(directory) and os.listdir(directory) and '-force' not in options:
+            return f'[ERROR] {directory} is not empty & (use -force to overwrite the games there)'
+        num = get_store().export_folder(directory)
+        return f'{num} games have been exported & to {directory}'
+
+    def import_games(params, options):
+        directory = params[0]
+        if not os.path.isdir(directory):
+            return f'[ERROR] {directory} does not exist'
+        num = get_store().import_folder(directory)
+        return f'{num} games have been imported & (games with the same numbers & were replaced)'
+
     cmds = {
         'delete':
-        {'description': '> deletes a game by moving & it to the bin',
+        {'description': '> deletes a game with & its plays from the store',
          'num_of_args': 1,
          'examples': ['delete 5 # deletes a game #5'],
          'function': delete_game
@@ -244,6 +260,16 @@ class Commands:
         {'description': 'prints the best solution by the player &or (optional) by the algorightm',
          'num_of_args': 1,
          'examples': ['solution 14', 'solution 14 -algo'],
-         'function': solution}
+         'function': solution},
+        'export':
+        {'description': 'writes all games with their plays & to a folder (one json file per game)',
+         'num_of_args': 1,
+         'examples': ['export backup', 'export games -force &# overwrites the games/ folder'],
+         'function': export_games},
+        'import':
+        {'description': 'adds the games from a folder & of json files (as made by export)',
+         'num_of_args': 1,
+         'examples': ['import backup'],
+         'function': import_games}
     }
     cmds_set = set(cmds.keys())
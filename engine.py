@@ -0,0 +1,162 @@
+import numpy as np
+
+
+class LaplacianEngine:
+    '''
+    Array representation of a game: CSR adjacency, degree vector and int64 node values.
+    Nodes are addressed by their index in self.nodes (the original labels are kept for translation).
+    A firing vector x holds the number of times each node gives (negative means takes),
+    so applying it results in values - L @ x, where L is the graph Laplacian.
+    '''
+    def __init__(self, nodes, edges, values):
+        '''
+        :param nodes - node labels (their order defines the indices)
+        :param edges - pairs of node labels
+        :param values - node values in the order of nodes
+        '''
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        n = len(self.nodes)
+        pairs = np.array([(self.index[s], self.index[f]) for s, f in edges], dtype=np.int64).reshape(-1, 2)
+        rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        order = np.argsort(rows, kind='stable')
+        self.indices = cols[order]
+        self.degree = np.bincount(rows, minlength=n).astype(np.int64)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(self.degree, out=self.indptr[1:])
+        self.values = np.array(values, dtype=np.int64).reshape(n)
+        self._adjacency = None
+        self.bank = int(self.values.sum())
+        self.debt = int(self.values[self.values < 0].sum())
+
+    @classmethod
+    def from_graph(cls, G):
+        nodes = list(G.nodes)
+        return cls(nodes, G.edges, [G.nodes[n]['val'] for n in nodes])
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def copy(self):
+        other = object.__new__(LaplacianEngine)
+        other.__dict__.update(self.__dict__)
+        other.values = self.values.copy()
+        return other
+
+    def __getstate__(self):
+        # only the arrays travel to worker processes; the label index and adjacency lists are rebuilt there
+        state = self.__dict__.copy()
+        del state['index']
+        state['_adjacency'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+
+    def adjacency(self):
+        '''
+        Neighbours as python lists for the scalar loops of the solvers (cached)
+        '''
+        if self._adjacency is None:
+            indices = self.indices.tolist()
+            indptr = self.indptr.tolist()
+            self._adjacency = [indices[indptr[i]:indptr[i + 1]] for i in range(len(self.nodes))]
+        return self._adjacency
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def fire(self, i, times=1):
+        '''
+        Node i gives `times` times (takes if `times` is negative); O(deg) update of values and debt
+        '''
+        neig = self.neighbors(i)
+        values = self.values
+        debt = self.debt
+        debt -= min(int(values[i]), 0) + int(np.minimum(values[neig], 0).sum())
+        values[i] -= times * self.degree[i]
+        values[neig] += times
+        debt += min(int(values[i]), 0) + int(np.minimum(values[neig], 0).sum())
+        self.debt = debt
+
+    def set_value(self, i, val):
+        old = int(self.values[i])
+        self.values[i] = val
+        self.bank += val - old
+        self.debt += min(val, 0) - min(old, 0)
+
+    def give(self, i):
+        self.fire(i, 1)
+
+    def take(self, i):
+        self.fire(i, -1)
+
+    def laplacian_dot(self, x):
+        '''
+        L @ x for a firing vector of shape (n,) or a batch of them of shape (n, k)
+        '''
+        x = np.asarray(x, dtype=np.int64)
+        acc = np.zeros((len(self.indices) + 1,) + x.shape[1:], dtype=np.int64)
+        np.cumsum(x[self.indices], axis=0, out=acc[1:])
+        neighbours_sum = acc[self.indptr[1:]] - acc[self.indptr[:-1]]
+        degree = self.degree if x.ndim == 1 else self.degree[:, None]
+        return degree * x - neighbours_sum
+
+    def dense_laplacian(self):
+        '''
+        L as an (n, n) int64 array, for the solvers and simulations that work on many states at once
+        '''
+        n = len(self)
+        L = np.zeros((n, n), dtype=np.int64)
+        L[np.repeat(np.arange(n), self.degree), self.indices] = -1
+        L[np.arange(n), np.arange(n)] = self.degree
+        return L
+
+    def move_matrix(self):
+        '''
+        The change of the values by every single move, shape (2n, n): row i is node i giving (-L[i]),
+        row n + i is node i taking (+L[i])
+        '''
+        L = self.dense_laplacian()
+        return np.concatenate([-L, L])
+
+    def outcome(self, x):
+        '''
+        Values after applying the firing vector(s) x, leaves the engine untouched
+        '''
+        x = np.asarray(x, dtype=np.int64)
+        values = self.values if x.ndim == 1 else self.values[:, None]
+        return values - self.laplacian_dot(x)
+
+    def move_debts(self, values=None):
+        '''
+        The debt after each single move, for all of them at once: shape (2, n), [0][i] after node i gives,
+        [1][i] after node i takes. values - the state to look ahead from, (n,) or a batch (n, k) (default: the
+        current values; the result is then (2, n, k)). Only the mover and its neighbours change, by -+deg and +-1,
+        so the change of the debt is local: O(edges) instead of O(n^2) for trying the moves one by one
+        '''
+        values = self.values if values is None else np.asarray(values, dtype=np.int64)
+        degree = self.degree if values.ndim == 1 else self.degree[:, None]
+        debt = np.minimum(values, 0).sum(axis=0)
+        own = np.minimum(values, 0)
+        # a neighbour in debt gets one dollar closer to zero, one without a surplus gets (deeper) into debt
+        in_debt = (values < 0).astype(np.int64)
+        not_positive = (values <= 0).astype(np.int64)
+        give = debt + np.minimum(values - degree, 0) - own + degree * in_debt - self.laplacian_dot(in_debt)
+        take = debt + np.minimum(values + degree, 0) - own - (degree * not_positive - self.laplacian_dot(not_positive))
+        return np.stack([give, take])
+
+    def apply(self, x):
+        self.values = self.outcome(x)
+        self.debt = int(self.values[self.values < 0].sum())
+
+    def is_victory(self):
+        return self.debt == 0
+
+    def collapsed(self, x):
+        '''
+        Translates a firing vector to the {node: number} format of collapse_moves (positive = take)
+        '''
+        return {self.nodes[i]: -int(k) for i, k in enumerate(x) if k}
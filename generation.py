@@ -0,0 +1,145 @@
+'''
+Random games: connected planar graphs, node values and their positions on the field.
+Kept free of pygame so that the batch generator can run it in worker processes.
+'''
+import numpy as np
+import networkx as nx
+
+
+def _key(s, f):
+    return (s, f) if s < f else (f, s)
+
+
+def random_triangulation(n, rng):
+    '''
+    Edges of a random maximal planar graph on n >= 3 nodes (3n - 6 edges): every node is put into a random
+    face of a triangulation of the sphere, then random edge flips that take edges away from busier nodes
+    even out the degrees (inserting alone makes hubs).
+    opposite[edge] holds the two nodes facing the edge, which is all a flip needs to know
+    '''
+    opposite = {(0, 1): [2, 2], (0, 2): [1, 1], (1, 2): [0, 0]}
+    faces = [(0, 1, 2), (0, 1, 2)]
+    for v in range(3, n):
+        a, b, c = faces.pop(rng.integers(len(faces)))
+        faces += [(a, b, v), (a, c, v), (b, c, v)]
+        for edge, other in ((_key(a, b), c), (_key(a, c), b), (_key(b, c), a)):
+            facing = opposite[edge]
+            facing[facing.index(other)] = v
+        opposite[(a, v)] = [b, c]
+        opposite[(b, v)] = [a, c]
+        opposite[(c, v)] = [a, b]
+
+    edges = list(opposite)
+    degree = np.bincount(np.array(edges).ravel(), minlength=n)
+    for k in rng.integers(len(edges), size=4 * len(edges)):
+        a, b = edges[k]
+        c, d = opposite[(a, b)]
+        cd = _key(c, d)
+        if cd in opposite or degree[a] + degree[b] <= degree[c] + degree[d] + 2:
+            continue
+        # the triangles (a, b, c), (a, b, d) become (c, d, a), (c, d, b)
+        del opposite[(a, b)]
+        for edge, old, new in ((_key(a, c), b, d), (_key(b, c), a, d), (_key(a, d), b, c), (_key(b, d), a, c)):
+            facing = opposite[edge]
+            facing[facing.index(old)] = new
+        opposite[cd] = [a, b]
+        edges[k] = cd
+        degree[a] -= 1
+        degree[b] -= 1
+        degree[c] += 1
+        degree[d] += 1
+    return edges
+
+
+def random_connected_graph(n, density=0.25, genus=None, rng=None):
+    '''
+    A random connected planar graph, built rather than searched for: a random spanning tree of a random
+    triangulation plus some of its remaining edges (any subgraph of a planar graph is planar).
+    :param density - the share of the remaining edges that is added, from 0 (a tree) to 1 (a triangulation)
+    :param genus - the exact number of edges on top of the tree (overrides density), at most 2n - 5
+    :param rng - numpy.random.Generator
+    '''
+    rng = np.random.default_rng() if rng is None else rng
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    if n < 3:
+        G.add_edges_from((i, i + 1) for i in range(n - 1))
+        return G
+    edges = random_triangulation(n, rng)
+    extra = 2 * n - 5
+    genus = round(density * extra) if genus is None else min(max(genus, 0), extra)
+    # random labels, the triangulation is built from the first nodes outwards
+    labels = rng.permutation(n).tolist()
+    edges = [(labels[edges[k][0]], labels[edges[k][1]]) for k in rng.permutation(len(edges))]
+    parent = list(range(n))
+
+    def root(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    # kruskal over the shuffled edges gives the tree, the first `genus` edges left over close the cycles
+    rest = []
+    for s, f in edges:
+        rs, rf = root(s), root(f)
+        if rs != rf:
+            parent[rs] = rf
+            G.add_edge(s, f)
+        else:
+            rest.append((s, f))
+    G.add_edges_from(rest[:genus])
+    return G
+
+
+def random_list_of_values(n, bank=0, rng=None):
+    '''
+    n values from -3 to 3 that are corrected to sum up to exactly `bank` and have at least one negative
+    :param rng - numpy.random.Generator (a seeded one gives reproducible values)
+    '''
+    rng = np.random.default_rng() if rng is None else rng
+    a = rng.integers(-3, 4, n)
+    # the difference is spread over the nodes in one multinomial draw
+    diff = bank - int(a.sum())
+    a += np.sign(diff) * rng.multinomial(abs(diff), np.full(n, 1 / n))
+    if n > 1 and not (a < 0).any():
+        # a random node goes down to -1 and what it had is spread over the others
+        i = rng.integers(n)
+        surplus = int(a[i]) + 1
+        a[i] = -1
+        others = np.delete(np.arange(n), i)
+        a[others] += rng.multinomial(surplus, np.full(n - 1, 1 / (n - 1)))
+    return a.tolist()
+
+
+def transform_positions(positions):
+    # maps positions from networkx layout function to [210, 750] x [50, 550]
+    pos = np.array(list(positions.values()))
+    mins = np.min(pos, axis=0)
+    delta = np.tile(mins, (len(positions), 1))
+    pos -= delta
+    pos /= np.tile(np.max(pos, axis=0), (len(positions), 1))
+
+    pos *= np.tile([540, 500], (len(positions), 1))
+    pos += np.tile([210, 50], (len(positions), 1))
+    pos = np.around(pos)
+    res = dict(zip(positions.keys(), pos.tolist()))
+    return res
+
+
+def random_game(number_of_nodes, bank_minus_genus=0, display_layout='planar', density=0.25, rng=None):
+    '''
+    The parts of a playable game (bank >= genus): a graph, the list of node values and the node positions
+    '''
+    G = random_connected_graph(number_of_nodes, density=density, rng=rng)
+    if display_layout == 'planar':
+        posit = nx.planar_layout(G)
+    elif display_layout == 'shell':
+        posit = nx.shell_layout(G)
+    else:
+        raise KeyError('Unknown layout:', display_layout)
+
+    genus = G.number_of_edges() - G.number_of_nodes() + 1
+    values = random_list_of_values(
+        n=number_of_nodes, bank=genus + bank_minus_genus, rng=rng)
+    return G, values, transform_positions(posit)
@@ -1,13 +1,18 @@
-import os
-import json
+import random
 from datetime import datetime
-from copy import deepcopy
+from itertools import count
 from random import choice
 
 import numpy as np
 import networkx as nx
 
-from utils import GAMES_DIR, OPTIONS, get_list_of_game_files, dist
+from engine import LaplacianEngine
+from generation import random_game
+from solvers import (ASTAR_MAX_STATES, Budget, cheapest_shift, is_winnable, parallel_random_restarts, q_reduce, random_run,
+                     run_solver, solve_many)
+from solution_cache import FINAL_STATUSES, lookup, remember
+from storage import game_number
+from utils import OPTIONS, SpatialHash, get_list_of_game_files, get_store
 import animation
 from sfx import play_sfx
 
@@ -31,18 +36,15 @@ def node_takes(node_down, g, anim, moves, silent=False):
 def is_game_valid(G):
     mask = [G.nodes[n]['val'] < 0 for n in G.nodes]
     at_least_one_negative = sum(mask)
-    winnable = G.bank >= G.genus
     enough_nodes = len(G.nodes) > 2
     enough_edges = len(G.edges) > 1
     connected = G.is_connected()
-    return winnable and enough_nodes and enough_edges and at_least_one_negative and connected
+    return enough_nodes and enough_edges and at_least_one_negative and connected and G.is_winnable()
 
 
 def mouse_on_node(G, pos):
-    for node, attr in G.nodes.items():
-        if dist(pos, attr['pos']) < 20:
-            return (True, node)
-    return (False, None)
+    node = G.grid.nearest(pos, 20)
+    return (node is not None, node)
 
 
 def create_node(G, node_num, pos):
@@ -71,28 +73,53 @@ def decrease_value(G, node):
 
 def far_enough_from_nodes(G, release_pos):
     # to avoid overcrowding :)
-    for node in G.nodes:
-        if dist(release_pos, G.nodes[node]['pos']) < 80:
-            return False
-    return True
+    return not G.grid.within(release_pos, 80)
+
+# unique across graphs, so that a version also tells which graph it belongs to
+LAYOUT_VERSIONS = count()
+
 
 class DGGraph(nx.Graph):
     def __init__(self, **kwargs):
+        self._engine = None
+        self._winnable = None
+        # node positions for hit tests, kept in sync by add_node, move_node and remove_node
+        self.grid = SpatialHash()
+        # renewed whenever what the static layer shows (nodes, edges, positions) changes
+        self.layout_version = next(LAYOUT_VERSIONS)
         super().__init__(self, **kwargs)
         self.genus = 1
         self.bank = 0
         self.debt = 0
         self._update_bank()
 
+    @property
+    def engine(self):
+        # array representation of the game; rebuilt lazily after the topology changes
+        if self._engine is None:
+            self._engine = LaplacianEngine.from_graph(self)
+        return self._engine
+
     # indicators
     def is_connected(self):
         if len(self.nodes) > 0:
             return nx.is_connected(self)
         return False
+
+    def is_winnable(self):
+        # moves do not change it, so it is only recomputed after edits
+        if self._winnable is None:
+            self._winnable = is_winnable(self.engine)
+        return self._winnable
     # sandbox mode
 
     def add_node(self, node, val=0, pos=None):
         super().add_node(node, val=val, pos=pos)
+        if pos is not None:
+            self.grid.move(node, pos)
+        self.layout_version = next(LAYOUT_VERSIONS)
+        self._engine = None
+        self._winnable = None
         self._update_genus()
         self._update_bank()
         self._update_debt()
@@ -103,22 +130,42 @@ class DGGraph(nx.Graph):
     def add_edges_from(self, edges):
         pass
 
+    def move_node(self, node, pos):
+        if tuple(self.nodes[node]['pos']) == tuple(pos):
+            return
+        self.nodes[node]['pos'] = pos
+        self.grid.move(node, pos)
+        self.layout_version = next(LAYOUT_VERSIONS)
+
     def remove_node(self, node):
         super().remove_node(node)
+        self.grid.remove(node)
+        self.layout_version = next(LAYOUT_VERSIONS)
+        self._engine = None
+        self._winnable = None
         self._update_genus()
         self._update_bank()
         self._update_debt()
 
     def add_edge(self, s, f):
         super().add_edge(s, f)
+        self.layout_version = next(LAYOUT_VERSIONS)
+        self._engine = None
+        self._winnable = None
         self._update_genus()
 
     def remove_edge(self, s, f):
         super().remove_edge(s, f)
+        self.layout_version = next(LAYOUT_VERSIONS)
+        self._engine = None
+        self._winnable = None
         self._update_genus()
 
     def change_value(self, node, increase=True):
         self.nodes[node]['val'] += (1 if increase else -1)
+        if self._engine is not None:
+            self._engine.set_value(self._engine.index[node], self.nodes[node]['val'])
+        self._winnable = None
         self._update_bank()
         self._update_debt()
 
@@ -134,19 +181,34 @@ class DGGraph(nx.Graph):
 
     # level mode
 
+    def _fire(self, node, times):
+        # the engine updates values and debt in O(deg), here only the touched nodes are synced back
+        engine = self.engine
+        i = engine.index[node]
+        engine.fire(i, times)
+        self.nodes[node]['val'] = int(engine.values[i])
+        for j in engine.neighbors(i):
+            self.nodes[engine.nodes[j]]['val'] = int(engine.values[j])
+        self.debt = engine.debt
+
     def take(self, node):
-        neig = list(self.neighbors(node))
-        for n in neig:
-            self.nodes[n]['val'] -= 1
-        self.nodes[node]['val'] += len(neig)
-        self._update_debt()
+        self._fire(node, -1)
 
     def give(self, node):
-        neig = list(self.neighbors(node))
-        for n in neig:
-            self.nodes[n]['val'] += 1
-        self.nodes[node]['val'] -= len(neig)
-        self._update_debt()
+        self._fire(node, 1)
+
+    def apply_firing(self, collapsed):
+        '''
+        Applies a whole collapsed solution ({node: number}, positive = take) at once
+        '''
+        engine = self.engine
+        x = np.zeros(len(engine), dtype=np.int64)
+        for node, num in collapsed.items():
+            x[engine.index[node]] = -num
+        engine.apply(x)
+        for node, val in zip(engine.nodes, engine.values.tolist()):
+            self.nodes[node]['val'] = val
+        self.debt = engine.debt
 
     def is_victory(self):
         return self.debt == 0
@@ -155,8 +217,7 @@ class DGGraph(nx.Graph):
 # utils
 
 def load_game(filename):
-    with open(os.path.join(GAMES_DIR, filename), 'r') as fr:
-        dat = json.load(fr)
+    dat = get_store().game(game_number(filename))
     G = DGGraph(info=dat['info'])
     for n, v in dat['graph']['values'].items():
         G.add_node(int(n), val=v, pos=dat['graph']['positions'][n])
@@ -173,61 +234,15 @@ def get_random_game():
 
 # graph generation
 
-def random_connected_graph(n):
-    done = False
-    while not done:
-        G = nx.binomial_graph(n, 0.25)
-        done = nx.is_connected(G) and nx.check_planarity(G)[0]
-    # TODO: check if planar (how to generate a connected planar graph?)
-    return G
-
-
-def random_list_of_values(n, bank=0):
-    a = np.random.randint(-3, 4, n)
-    diff = sum(a) - bank
-    shifts = (2, 1) if diff > 0 else (-2, -1)
-    for i in range(abs(diff)):
-        inds = np.random.choice(np.arange(len(a)), 2)
-        a[inds[0]] -= shifts[0]
-        a[inds[1]] += shifts[1]
-    if not sum(a < 0):
-        a[0] += max(a)
-        a[-1] -= max(a)
-    return a.tolist()
-
-
-def transform_positions(positions):
-    # maps positions from networkx layout function to [210, 750] x [50, 550]
-    pos = np.array(list(positions.values()))
-    mins = np.min(pos, axis=0)
-    delta = np.tile(mins, (len(positions), 1))
-    pos -= delta
-    pos /= np.tile(np.max(pos, axis=0), (len(positions), 1))
-
-    pos *= np.tile([540, 500], (len(positions), 1))
-    pos += np.tile([210, 50], (len(positions), 1))
-    pos = np.around(pos)
-    res = dict(zip(positions.keys(), pos.tolist()))
-    return res
-
-
-def generate_game(number_of_nodes: int, bank_minus_genus=0, display_layout='planar') -> DGGraph:
+def generate_game(number_of_nodes: int, bank_minus_genus=0, display_layout='planar', density=0.25,
+                  rng=None) -> DGGraph:
     '''
     This function creates a graph representing a playable game (i.e. bank>=genus)
+    :param density - how many cycles the graph has, see random_connected_graph
+    :param rng - numpy.random.Generator for a reproducible game
     '''
-    G = random_connected_graph(number_of_nodes)
-    if display_layout == 'planar':
-        posit = nx.planar_layout(G)
-    elif display_layout == 'shell':
-        posit = nx.shell_layout(G)
-    else:
-        raise KeyError('Unknown layout:', display_layout)
-
-    genus = G.number_of_edges() - G.number_of_nodes() + 1
-    values = random_list_of_values(
-        n=number_of_nodes, bank=genus + bank_minus_genus)
+    G, values, posit = random_game(number_of_nodes, bank_minus_genus, display_layout, density, rng)
     dt_string = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    posit = transform_positions(posit)
     DG = DGGraph(info={'date_created': dt_string})
     for n in range(number_of_nodes):
         DG.add_node(n, val=values[n], pos=posit[n])
@@ -249,29 +264,102 @@ def collapse_moves(moves):
 
 
 def solve(G):
-    moves = []
-    while True:
-        n = choice(list(G.nodes))
-        if G.nodes[n]['val'] > 0:
-            G.give(n)
-            moves.append((n, 'give'))
-        elif G.nodes[n]['val'] < 0:
-            G.take(n)
-            moves.append((n, 'take'))
-        if G.is_victory():
-            return collapse_moves(moves)
-
-
-def find_best(G, N=10):
-    best_so_far = None
-    min_num_of_moves = np.inf
-    for _ in range(N):
-        g = deepcopy(G)
-        moves, number_of_moves = solve(g)
-        if number_of_moves < min_num_of_moves:
-            best_so_far = moves
-            min_num_of_moves = number_of_moves
-    return best_so_far, min_num_of_moves
+    if not G.is_winnable():
+        return None, None
+    x = random_run(G.engine)
+    return G.engine.collapsed(x), sum(map(abs, x))
+
+
+def solve_within(G, strategy='exact', seconds=None, max_iterations=None, cancel=None, on_progress=None, N=10,
+                 seed=None, use_cache=False, width=None, max_states=ASTAR_MAX_STATES):
+    '''
+    Bounded solver: stops after `seconds`, `max_iterations` or once `cancel` (e.g. threading.Event) is set
+    and returns a SolverResult with the best solution found so far and the reason it stopped;
+    on_progress gets every improvement (see solvers.run_solver).
+    With use_cache the run starts from the cached solution (and is skipped if that one is proven optimal)
+    and the cache is updated afterwards
+    '''
+    cached = lookup(G.engine) if use_cache else None
+    if cached is not None and cached.status in FINAL_STATUSES:
+        return cached
+    budget = Budget(seconds=seconds, max_iterations=max_iterations, cancel=cancel)
+    rng = random if seed is None else random.Random(seed)
+    result = run_solver(G.engine, strategy=strategy, restarts=N, budget=budget, on_progress=on_progress, rng=rng,
+                        incumbent=None if cached is None else cached.x, width=width, max_states=max_states)
+    return remember(G.engine, result, strategy) if use_cache else result
+
+
+def solve_games(games, strategy='exact', seconds=None, workers=None, seed=None, N=10, use_cache=False):
+    '''
+    solve_within for a list of games, each one solved in its own worker process (workers - pool size,
+    defaults to the number of cores); returns the SolverResults in the order of the games
+    '''
+    engines = [G.engine for G in games]
+    results = [lookup(engine) if use_cache else None for engine in engines]
+    todo = [i for i, cached in enumerate(results) if cached is None or cached.status not in FINAL_STATUSES]
+    solved = solve_many([engines[i] for i in todo], strategy=strategy, restarts=N, seconds=seconds,
+                        workers=workers, seed=seed,
+                        incumbents=[None if results[i] is None else results[i].x for i in todo])
+    for i, result in zip(todo, solved):
+        results[i] = remember(engines[i], result, strategy) if use_cache else result
+    return results
+
+
+def find_best(G, N=10, workers=None, seed=None, strategy='random', width=None, max_states=ASTAR_MAX_STATES):
+    '''
+    The best of N random runs; with `workers` > 1 the runs are split over that many processes
+    (worth it for large N or big graphs). A fixed seed gives the same result for the same number of workers.
+    strategy='greedy' or 'beam' makes the N runs debt-guided ones (see solvers.beam_run) instead;
+    strategy='astar' is a single best-first search (see solvers.astar_run) of beam width `width` (None - the default,
+    'all' - exact) remembering at most `max_states` states, it ignores N
+    '''
+    if strategy == 'random' and workers is not None and workers > 1 and G.is_winnable():
+        x = parallel_random_restarts(G.engine, N, workers=workers, seed=seed)
+        return G.engine.collapsed(x), sum(map(abs, x))
+    result = solve_within(G, strategy=strategy, N=N, seed=seed, width=width, max_states=max_states)
+    return result.moves, result.num_moves
+
+
+def find_optimal(G, N=10):
+    '''
+    Exact minimum number of moves: a winnability witness and the best of N random runs bound an exhaustive
+    branch and bound over firing vectors; returns the same (collapsed, num_moves) as find_best
+    '''
+    result = solve_within(G, strategy='exact', N=N)
+    return result.moves, result.num_moves
+
+
+def q_reduced_divisor(G, q=None):
+    '''
+    The q-reduced divisor equivalent to the game (Dhar's burning algorithm) and the collapsed
+    moves leading to it; q defaults to the first node. The game is winnable iff the reduced value of q is >= 0
+    '''
+    engine = G.engine
+    i = 0 if q is None else engine.index[q]
+    reduced, x = q_reduce(engine, i)
+    return dict(zip(engine.nodes, reduced)), engine.collapsed(x)
+
+
+def winning_firing(G):
+    '''
+    A witness of winnability in the find_best format, (None, None) for unwinnable games.
+    Not optimal, but any constant shift of a firing vector is equivalent, so the cheapest shift is taken
+    '''
+    if not G.is_winnable():
+        return None, None
+    engine = G.engine
+    x = cheapest_shift(q_reduce(engine)[1])
+    return engine.collapsed(x), sum(map(abs, x))
+
+
+def lookahead(G):
+    '''
+    The debt the game would be in after every single move, computed at once:
+    {'give': {node: debt}, 'take': {node: debt}}
+    '''
+    engine = G.engine
+    give, take = engine.move_debts().tolist()
+    return {'give': dict(zip(engine.nodes, give)), 'take': dict(zip(engine.nodes, take))}
 
 
 def show_instruction(moves, arrows=True):
@@ -1,7 +1,11 @@
-from windows.menu import MenuWindow
-from sfx import play_bg_music
+from multiprocessing import freeze_support
 
-play_bg_music()
 
 if __name__ == '__main__':
+    # solver worker processes re-import this module, they must not open a window or play music
+    freeze_support()
+    from windows.menu import MenuWindow
+    from sfx import play_bg_music
+
+    play_bg_music()
     MenuWindow()
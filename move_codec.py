@@ -0,0 +1,159 @@
+'''
+Compact binary encoding of a recorded play (a sequence of (node, 'give' | 'take') moves).
+Layout: a version byte, a header with the number of moves and the collapsed moves ({node: number},
+positive = take, as in graph.collapse_moves) and the body of runs of equal moves.
+A move is the varint of node << 2 | take << 1 | run, where run means that a varint with the length
+of the run follows. The header alone answers the usual questions (how long, what is the net effect).
+'''
+import json
+
+
+VERSION = 1
+MOVES = ('give', 'take')
+
+
+def _write_varint(out, value):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+class MoveSequence:
+    '''
+    Moves of a play kept as encoded runs (appending a move is O(1), repeated moves of one node
+    take no extra space), with the move count and the collapsed moves maintained on the fly.
+    Behaves like the list of (node, move) pairs it replaces: append, len, iteration
+    '''
+    def __init__(self, moves=()):
+        self._runs = bytearray()
+        self._last = None # the open run: [token, length]
+        self._num_moves = 0
+        self._collapsed = {}
+        for move in moves:
+            self.append(move)
+
+    def append(self, move):
+        node, direction = move
+        take = MOVES.index(direction)
+        token = int(node) << 1 | take
+        if self._last is not None and self._last[0] == token:
+            self._last[1] += 1
+        else:
+            self._close_run()
+            self._last = [token, 1]
+        self._num_moves += 1
+        self._collapsed[node] = self._collapsed.get(node, 0) + (1 if take else -1)
+
+    def _close_run(self):
+        if self._last is not None:
+            self._runs += _encode_run(*self._last)
+            self._last = None
+
+    def __len__(self):
+        return self._num_moves
+
+    def __iter__(self):
+        runs = bytes(self._runs)
+        if self._last is not None:
+            runs += _encode_run(*self._last)
+        return _decode_runs(runs)
+
+    def collapsed(self):
+        '''
+        (collapsed, number of moves played), without going through the moves. The dict is the one of
+        graph.collapse_moves, but the count is not its sum |n|: moves that cancel out are counted too
+        '''
+        return {node: num for node, num in self._collapsed.items()}, self._num_moves
+
+    def to_bytes(self):
+        out = bytearray([VERSION])
+        _write_varint(out, self._num_moves)
+        nonzero = [(node, num) for node, num in self._collapsed.items() if num]
+        _write_varint(out, len(nonzero))
+        for node, num in nonzero:
+            _write_varint(out, int(node))
+            _write_varint(out, _zigzag(num))
+        out += self._runs
+        if self._last is not None:
+            out += _encode_run(*self._last)
+        return bytes(out)
+
+
+def _encode_run(token, length):
+    out = bytearray()
+    if length == 1:
+        _write_varint(out, token << 1)
+    else:
+        _write_varint(out, token << 1 | 1)
+        _write_varint(out, length)
+    return bytes(out)
+
+
+def _decode_runs(data, pos=0):
+    while pos < len(data):
+        token, pos = _read_varint(data, pos)
+        length = 1
+        if token & 1:
+            length, pos = _read_varint(data, pos)
+        token >>= 1
+        move = (token >> 1, MOVES[token & 1])
+        for _ in range(length):
+            yield move
+
+
+def _read_header(data):
+    if data[0] != VERSION:
+        raise ValueError(f'Unknown moves encoding version: {data[0]}')
+    num_moves, pos = _read_varint(data, 1)
+    count, pos = _read_varint(data, pos)
+    collapsed = {}
+    for _ in range(count):
+        node, pos = _read_varint(data, pos)
+        num, pos = _read_varint(data, pos)
+        collapsed[node] = _unzigzag(num)
+    return num_moves, collapsed, pos
+
+
+def encode_moves(moves):
+    if not isinstance(moves, MoveSequence):
+        moves = MoveSequence(moves)
+    return moves.to_bytes()
+
+
+def decode_moves(data):
+    '''
+    The list of [node, move] pairs; json text of the old format is read as well
+    '''
+    if isinstance(data, str):
+        return json.loads(data)
+    return [list(move) for move in _decode_runs(data, _read_header(data)[2])]
+
+
+def read_summary(data):
+    '''
+    (collapsed, number of moves played) from the header only, see MoveSequence.collapsed
+    '''
+    if isinstance(data, str):
+        return MoveSequence(json.loads(data)).collapsed()
+    num_moves, collapsed, _ = _read_header(data)
+    return collapsed, num_moves
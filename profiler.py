@@ -0,0 +1,109 @@
+'''
+Frame-time profiler for the main loops. A frame is split into laps: each window calls lap(name) after a part
+of its loop (event handling, drawing the graph, the labels, ...) and the time since the previous lap is booked
+under that name. Rolling percentiles over the last frames are shown by the overlay (F3) and printed in the log mode (F4).
+When both are off every hook returns at once.
+'''
+import gc
+import sys
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+
+PROFILER_WINDOW = 240 # frames the percentiles are taken over
+PROFILER_LOG_EVERY = 120 # frames between two lines of the log
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    def __init__(self, window=PROFILER_WINDOW, log_every=PROFILER_LOG_EVERY):
+        self.window = window
+        self.log_every = log_every
+        self.overlay = False
+        self.log = False
+        self.enabled = False
+        self._reset()
+
+    def _reset(self):
+        self.laps = {} # name: deque of milliseconds, one per frame
+        self.frame_times = deque(maxlen=self.window)
+        self.allocations = deque(maxlen=self.window) # net change of allocated memory blocks
+        self.collections = deque(maxlen=self.window) # garbage collector runs
+        self.current = {}
+        self.frames = 0
+        self._start = self._last = None
+
+    def _toggle(self, overlay=None, log=None):
+        if overlay is not None:
+            self.overlay = overlay
+        if log is not None:
+            self.log = log
+        was_enabled, self.enabled = self.enabled, self.overlay or self.log
+        if self.enabled and not was_enabled:
+            self._reset()
+
+    def toggle_overlay(self):
+        self._toggle(overlay=not self.overlay)
+
+    def toggle_log(self):
+        self._toggle(log=not self.log)
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self._start = self._last = perf_counter()
+        self._blocks = sys.getallocatedblocks()
+        self._collections = sum(stat['collections'] for stat in gc.get_stats())
+        self.current = {}
+
+    def lap(self, name):
+        '''
+        Books the time since the previous lap (or the start of the frame) under name
+        '''
+        if not self.enabled or self._last is None:
+            return
+        now = perf_counter()
+        self.current[name] = self.current.get(name, 0.) + (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self):
+        if not self.enabled or self._start is None:
+            return
+        self.lap('other')
+        self.frame_times.append((self._last - self._start) * 1000)
+        self.allocations.append(sys.getallocatedblocks() - self._blocks)
+        self.collections.append(sum(stat['collections'] for stat in gc.get_stats()) - self._collections)
+        for name in self.current.keys() | self.laps.keys():
+            if name not in self.laps:
+                # a lap that only now appeared took no time in the frames before
+                self.laps[name] = deque([0.] * (len(self.frame_times) - 1), maxlen=self.window)
+            self.laps[name].append(self.current.get(name, 0.))
+        self._start = self._last = None
+        self.frames += 1
+        if self.log and self.frames % self.log_every == 0:
+            print(' | '.join(self.report()))
+
+    def percentiles(self, name=None):
+        '''
+        p50, p95, p99 in milliseconds of a lap (of the whole frame if name is None)
+        '''
+        times = self.frame_times if name is None else self.laps[name]
+        if not times:
+            return (0.,) * len(PERCENTILES)
+        return tuple(np.percentile(times, PERCENTILES))
+
+    def report(self):
+        '''
+        Lines of text: the whole frame, every lap (the slowest first) and the allocations
+        '''
+        percentiles = lambda name: '/'.join(f'{p:.2f}' for p in self.percentiles(name))
+        names = sorted(self.laps, key=lambda name: -self.percentiles(name)[-1])
+        allocations = np.mean(self.allocations) if self.allocations else 0
+        return [f'frame p50/95/99 ms {percentiles(None)}'] + \
+               [f'{name} {percentiles(name)}' for name in names] + \
+               [f'blocks/frame {allocations:+.0f}, gc runs {sum(self.collections)}']
+
+
+profiler = FrameProfiler()
@@ -2,23 +2,42 @@ import os
 import numpy as np
 
 import pygame
-from ui_elements import Panel
+from ui_elements import Panel, render_text, text_cache
 
-from utils import GREEN, OPTIONS, PANEL_HEIGHT, RED, THEME, UPSCALE_POS_PREVIEW, WIDTH, HEIGHT, FONT_DIR
-from graph import is_game_valid
+from utils import FRAMERATE, GREEN, IDLE_AFTER, IDLE_FRAMERATE, OPTIONS, PANEL_HEIGHT, RED, THEME, UPSCALE_POS_PREVIEW, WIDTH, HEIGHT, FONT_DIR
+from profiler import profiler
 
 
 pygame_icon = pygame.image.load(os.path.join('assets','icon.png'))
 pygame.display.set_icon(pygame_icon)
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.font.init()
-default_font = pygame.font.SysFont('cambria', 20)
-my_font = pygame.font.SysFont(FONT_DIR, 30)
-my_font_bigger = pygame.font.SysFont(FONT_DIR, 36)
-my_font_hover = pygame.font.SysFont(FONT_DIR, 26)
+
+
+class LazyFont:
+    '''
+    A pygame.font.SysFont that is only created when it is first used
+    '''
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.font = None
+
+    def __getattr__(self, attr):
+        # only reached for the attributes of the font itself
+        if self.font is None:
+            self.font = pygame.font.SysFont(self.name, self.size)
+        return getattr(self.font, attr)
+
+
+default_font = LazyFont('cambria', 20)
+my_font = LazyFont(FONT_DIR, 30)
+my_font_bigger = LazyFont(FONT_DIR, 36)
+my_font_hover = LazyFont(FONT_DIR, 26)
+profiler_font = LazyFont('consolas', 15)
 
 def blit(text, position, color='#FFFFFF', font=my_font):
-    screen.blit(font.render(text, False, color), position)
+    screen.blit(render_text(font, text, color), position)
 
 def create_panels(df):
     panels = []
@@ -41,6 +60,9 @@ def display_prev_stats(game_number, best=None):
 
 
 def display_labels(G, sandbox, num_moves=None, y_shift_genus_bank=False):
+    # graph (and networkx with it) is not needed to show the menu
+    from graph import is_game_valid
+
     # node values
     for n in G.nodes():
         current_value = G.nodes[n]['val']
@@ -62,21 +84,181 @@ def display_labels(G, sandbox, num_moves=None, y_shift_genus_bank=False):
         blit(f'MOVES = {num_moves}', (20, 80 + shift), THEME['def'])
 
 
+class StaticLayer:
+    '''
+    Edges and node outlines of a graph drawn once to an off-screen surface; redrawn only when
+    the layout_version of the graph (renewed with every change of the topology and positions) is not the cached one
+    '''
+    # fills the background of the layer and is made transparent
+    COLORKEY = (255, 0, 255)
+
+    def __init__(self):
+        self.key = None
+        self.surface = None
+        self.topleft = (0, 0)
+
+    def draw(self, G):
+        key = (G.layout_version, THEME['def'])
+        if key != self.key:
+            self.key = key
+            self._render(G)
+        if self.surface is not None:
+            screen.blit(self.surface, self.topleft)
+
+    def _render(self, G):
+        if not len(G.nodes):
+            self.surface = None
+            return
+        # only the bounding box of the graph (plus the node radius) is kept
+        pos = np.array([G.nodes[node]['pos'] for node in G.nodes], dtype=float)
+        left, top = np.floor(pos.min(axis=0)).astype(int) - 22
+        right, bottom = np.ceil(pos.max(axis=0)).astype(int) + 22
+        self.topleft = (left, top)
+        self.surface = pygame.Surface((right - left, bottom - top)).convert()
+        self.surface.fill(StaticLayer.COLORKEY)
+        # run-length encoded transparency: blitting mostly empty surfaces is then cheap
+        self.surface.set_colorkey(StaticLayer.COLORKEY, pygame.RLEACCEL)
+        shift = lambda p: (p[0] - left, p[1] - top)
+        for node in G.nodes:
+            pygame.draw.circle(self.surface, THEME['def'], shift(G.nodes[node]['pos']), 20, 2)
+        for s, f in G.edges:
+            pygame.draw.line(self.surface, THEME['def'],
+                             shift(G.nodes[s]['pos']),
+                             shift(G.nodes[f]['pos']), 2)
+
+
+static_layer = StaticLayer()
+
+
 def display_nodes_edges(G, node_to_highlight):
-    # nodes
+    static_layer.draw(G)
+    # only the hovered node changes from frame to frame
     if node_to_highlight is not None:
-        for node in G.nodes:
-            pygame.draw.circle(screen, THEME['def'] if node != node_to_highlight else '#00ff00',
-                           G.nodes[node]['pos'], 20, 2)
-    else:
-        for node in G.nodes:
-            pygame.draw.circle(screen, THEME['def'],
-                           G.nodes[node]['pos'], 20, 2)
-    # edges
-    for s, f in G.edges:
-        pygame.draw.line(screen, THEME['def'],
-                         G.nodes[s]['pos'],
-                         G.nodes[f]['pos'], 2)
+        pygame.draw.circle(screen, '#00ff00', G.nodes[node_to_highlight]['pos'], 20, 2)
+
+class Renderer:
+    '''
+    Presents the frames of all the windows. With OPTIONS['partial_redraw'] off it is the plain full-screen update;
+    with it on only the regions that differ from the previous frame are sent to the display (the frame is compared
+    tile by tile, so moving buttons, tooltips, labels and animations are all caught without reporting their rects)
+    and, as long as nothing changes, the windows are run at IDLE_FRAMERATE, waking up at once on input
+    '''
+    TILE = 40
+
+    def __init__(self):
+        self.previous = None
+        self.unchanged_frames = 0
+
+    def update(self):
+        profiler.lap('other')
+        if profiler.overlay:
+            display_profiler()
+            profiler.lap('profiler')
+        if not OPTIONS['partial_redraw']:
+            self.previous = None
+            pygame.display.update()
+        else:
+            rects = self._dirty_rects()
+            if rects:
+                self.unchanged_frames = 0
+                pygame.display.update(rects)
+            else:
+                self.unchanged_frames += 1
+        profiler.lap('present')
+
+    def _dirty_rects(self):
+        # the view is indexed [x, y], the copy of the previous frame is kept row by row
+        frame = pygame.surfarray.pixels2d(screen).T
+        if self.previous is None or self.previous.shape != frame.shape:
+            self.previous = frame.copy()
+            return [screen.get_rect()]
+        h, w = frame.shape
+        t = self.TILE
+        # eight pixel comparisons per word; the screen size is a multiple of the tile size
+        tiles = (frame != self.previous).view(np.uint64).reshape(h // t, t, w // t, t // 8).any(axis=(1, 3))
+        rects = []
+        for ty in np.flatnonzero(tiles.any(axis=1)):
+            # changed tiles next to each other in a row make one rect
+            row = np.flatnonzero(tiles[ty])
+            for run in np.split(row, np.flatnonzero(np.diff(row) > 1) + 1):
+                rows, cols = slice(ty * t, (ty + 1) * t), slice(run[0] * t, (run[-1] + 1) * t)
+                self.previous[rows, cols] = frame[rows, cols]
+                rects.append(pygame.Rect(cols.start, rows.start, cols.stop - cols.start, t))
+        # the view locks the screen, it has to be gone before the display is updated
+        del frame
+        return rects
+
+    @property
+    def idle(self):
+        return OPTIONS['partial_redraw'] and self.unchanged_frames >= IDLE_AFTER
+
+    def tick(self, clock):
+        '''
+        clock.tick for the main loops; returns the milliseconds since the previous call as clock.tick does.
+        The waiting is where one frame ends and the next one starts for the profiler
+        '''
+        profiler.end_frame()
+        if not self.idle:
+            dt = clock.tick(FRAMERATE)
+        else:
+            # sleep in short steps so that input is not kept waiting for the whole idle frame
+            deadline = pygame.time.get_ticks() + 1000 // IDLE_FRAMERATE
+            while pygame.time.get_ticks() < deadline and not pygame.event.peek():
+                pygame.time.wait(5)
+            dt = clock.tick()
+        profiler.start_frame()
+        return dt
+
+
+renderer = Renderer()
+
+
+def profiler_hotkeys(event):
+    '''
+    F3 toggles the profiler overlay, F4 its log to the console; every window passes its events here
+    '''
+    if event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_F3:
+            profiler.toggle_overlay()
+        elif event.key == pygame.K_F4:
+            profiler.toggle_log()
+
+
+class ProfilerOverlay:
+    '''
+    The report of the profiler in the top right corner, refreshed a few times a second
+    (so that the ever-changing numbers do not flood the text cache)
+    '''
+    REFRESH_EVERY = 15 # frames
+
+    def __init__(self):
+        self.lines = []
+        self.refreshed_at = None
+
+    def draw(self):
+        if self.refreshed_at is None or profiler.frames - self.refreshed_at >= self.REFRESH_EVERY \
+                or profiler.frames < self.refreshed_at:
+            self.refreshed_at = profiler.frames
+            self.lines = profiler.report() + [
+                f'text cache {text_cache.hits} hits, {text_cache.misses} misses ({text_cache.hit_rate():.1%})']
+        surfaces = [render_text(profiler_font, line, '#FFFFFF') for line in self.lines]
+        width = max(surface.get_width() for surface in surfaces) + 12
+        height = sum(surface.get_height() for surface in surfaces) + 8
+        box = pygame.Surface((width, height))
+        box.set_alpha(190)
+        screen.blit(box, (WIDTH - width - 8, 8))
+        y = 12
+        for surface in surfaces:
+            screen.blit(surface, (WIDTH - width - 2, y))
+            y += surface.get_height()
+
+
+profiler_overlay = ProfilerOverlay()
+
+
+def display_profiler():
+    profiler_overlay.draw()
+
 
 def shift_tuple(tup, delta):
     return (tup[0] + delta[0], tup[1] + delta[1])
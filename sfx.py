@@ -1,36 +1,186 @@
+'''
+Sound effects and background music. Effects are decoded on demand into a cache that is bounded
+by the size of the decoded samples; the frequently used ones are preloaded on a worker thread.
+The next background track is read into memory on the same thread while the current one plays,
+so switching tracks does not wait for the disk.
+'''
+import io
 import os
 import random
+from collections import OrderedDict
+from itertools import count
+from queue import Queue
+from threading import Event, Lock, Thread
 
 from pygame import mixer
 
 from utils import SFX_DIR, OPTIONS
 
-mixer.init()
 
-sfx_files = os.listdir(SFX_DIR)
-sfx = {file[:-4]: mixer.Sound(os.path.join(SFX_DIR, file))
-    for file in sfx_files if not file.startswith('bg_music')}
+SFX_CACHE_BYTES = 512 * 1024 # decoded samples kept in memory
+PRELOADED_SFX = ('click', 'scroll_short_click') # loaded ahead and never evicted
 
-bg_music_tracks = [os.path.join(SFX_DIR, file) for file in sfx_files if file.startswith('bg_music')]
+mixer.init()
 
-def set_sfx_volume(vol):
-    global sfx
-    for s_effect in sfx.values():
-        s_effect.set_volume(vol)
 
+class AudioManager:
+    def __init__(self, directory=SFX_DIR, capacity=SFX_CACHE_BYTES, pinned=PRELOADED_SFX):
+        files = os.listdir(directory)
+        self.sfx_paths = {file[:-4]: os.path.join(directory, file)
+            for file in files if not file.startswith('bg_music')}
+        self.bg_music_tracks = [os.path.join(directory, file) for file in files if file.startswith('bg_music')]
+        self.capacity = capacity
+        self.pinned = set(pinned) # count towards the capacity but are never evicted
+        self.sfx = OrderedDict() # name: (sound, bytes), least recently played first
+        self.sfx_bytes = 0
+        self.sfx_volume = OPTIONS['sfx_volume']/100
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        # the track that is playing is streamed from memory, the next one is read ahead
+        self.bg_track = None # (path, data)
+        self.next_bg_track = None
+        self.prefetch = None # (token, Event) of the read-ahead in flight
+        self._tokens = count()
+        self.jobs = Queue()
+        self.worker = None
+
+    # the worker thread
+
+    def _submit(self, job, *args):
+        if self.worker is None:
+            self.worker = Thread(target=self._work, daemon=True)
+            self.worker.start()
+        self.jobs.put((job, args))
+
+    def _work(self):
+        while True:
+            job, args = self.jobs.get()
+            try:
+                job(*args)
+            except Exception as e:
+                # a missing or broken file only costs the read-ahead, playing it reports the error
+                print('audio:', e)
+
+    # sound effects
+
+    @staticmethod
+    def _size(sound):
+        frequency, size, channels = mixer.get_init()
+        return round(sound.get_length() * frequency) * channels * abs(size) // 8
+
+    def get_sfx(self, name):
+        with self.lock:
+            cached = self.sfx.get(name)
+            if cached is not None:
+                self.hits += 1
+                self.sfx.move_to_end(name)
+                return cached[0]
+            self.misses += 1
+        return self._load_sfx(name)
+
+    def _load_sfx(self, name):
+        sound = mixer.Sound(self.sfx_paths[name])
+        with self.lock:
+            if name in self.sfx:
+                # the worker got there first
+                return self.sfx[name][0]
+            sound.set_volume(self.sfx_volume)
+            size = self._size(sound)
+            self.sfx[name] = (sound, size)
+            self.sfx_bytes += size
+            # the least recently played make room (the newest one stays even if it alone is over the limit),
+            # the pinned ones are skipped
+            for other in [other for other in self.sfx if other != name and other not in self.pinned]:
+                if self.sfx_bytes <= self.capacity:
+                    break
+                _, evicted = self.sfx.pop(other)
+                self.sfx_bytes -= evicted
+        return sound
+
+    def preload_sfx(self, names=None):
+        for name in self.pinned if names is None else names:
+            if name in self.sfx_paths:
+                self._submit(self._load_sfx, name)
+
+    def set_sfx_volume(self, vol):
+        with self.lock:
+            self.sfx_volume = vol
+            for sound, _ in self.sfx.values():
+                sound.set_volume(vol)
+
+    def play_sfx(self, name):
+        self.get_sfx(name).play()
+
+    # background music
+
+    def _read_track(self, path):
+        with open(path, 'rb') as f:
+            return path, f.read()
+
+    def _prefetch(self, path, token, done):
+        try:
+            track = self._read_track(path)
+            with self.lock:
+                # a read-ahead play_bg_music no longer waits for is dropped
+                if self.prefetch is not None and self.prefetch[0] == token:
+                    self.next_bg_track = track
+        finally:
+            done.set()
+
+    def play_bg_music(self):
+        '''
+        Plays the track read ahead (a random one the first time) and reads ahead another one
+        '''
+        if not self.bg_music_tracks:
+            return
+        with self.lock:
+            pending = self.prefetch
+        if pending is not None:
+            # the next track is being read: waiting for the rest of it beats reading it again
+            pending[1].wait()
+        with self.lock:
+            track, self.next_bg_track, self.prefetch = self.next_bg_track, None, None
+        if track is None:
+            track = self._read_track(random.choice(self.bg_music_tracks))
+        self.bg_track = track
+        path, data = track
+        mixer.music.load(io.BytesIO(data), os.path.basename(path))
+        mixer.music.set_volume(OPTIONS['bg_music_volume']/100)
+        mixer.music.play(-1)
+        others = [other for other in self.bg_music_tracks if other != path]
+        token, done = next(self._tokens), Event()
+        with self.lock:
+            self.prefetch = (token, done)
+        self._submit(self._prefetch, random.choice(others or self.bg_music_tracks), token, done)
+
+    def memory(self):
+        '''
+        Bytes held: decoded sound effects and the background tracks (as read from the files)
+        '''
+        with self.lock:
+            tracks = [track for track in (self.bg_track, self.next_bg_track) if track is not None]
+        return {'sfx': self.sfx_bytes, 'sfx_capacity': self.capacity, 'sfx_cached': len(self.sfx),
+                'bg_music': sum(len(data) for _, data in tracks)}
+
+
+audio = AudioManager()
+
+
+def preload_sfx():
+    audio.preload_sfx()
 
-set_sfx_volume(OPTIONS['sfx_volume']/100)
+
+def set_sfx_volume(vol):
+    audio.set_sfx_volume(vol)
 
 
 def play_sfx(name):
-    sfx[name].play()
+    audio.play_sfx(name)
 
 
 def play_bg_music():
-    bg_track = random.choice(bg_music_tracks)
-    mixer.music.load(bg_track)
-    bg_music_set_vol(OPTIONS['bg_music_volume']/100)
-    mixer.music.play(-1)
+    audio.play_bg_music()
 
 
 def bg_music_set_vol(vol):
@@ -0,0 +1,128 @@
+'''
+Headless simulation of the game for reinforcement learning and bulk experiments: no pygame, no graph module.
+Environments follow the reset/step protocol of Gym (gymnasium), without depending on it:
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(action)
+An action is an integer in [0, 2 * n): a < n means node a gives, a >= n means node a - n takes.
+The reward is the change of the debt (so positive when the debt shrinks); an episode terminates on victory.
+Observations are read-only views of the values the environment works on - they are not copied,
+and change with the next step (copy them to keep a history).
+'''
+import numpy as np
+
+from engine import LaplacianEngine
+from generation import random_game
+
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def random_engine(number_of_nodes, bank_minus_genus=0, density=0.25, rng=None):
+    # the positions are not used, the shell layout is the cheap one
+    G, values, _ = random_game(number_of_nodes, bank_minus_genus, 'shell', density, rng)
+    return LaplacianEngine(range(number_of_nodes), G.edges, values)
+
+
+class DollarGameEnv:
+    '''
+    One game. Either a fixed one (reset restores its values) or a new random one on every reset
+    '''
+    def __init__(self, engine=None, number_of_nodes=8, bank_minus_genus=0, density=0.25, max_steps=200, seed=None):
+        '''
+        :param engine - the game to play; None for random games with the given parameters
+        :param max_steps - episodes are truncated after that many steps
+        '''
+        self.rng = np.random.default_rng(seed)
+        self.game = engine
+        self.generator_params = (number_of_nodes, bank_minus_genus, density)
+        self.max_steps = max_steps
+        self.engine = None
+        self.steps = 0
+
+    @property
+    def num_actions(self):
+        return 2 * len(self.engine)
+
+    def reset(self, seed=None, engine=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        if engine is not None:
+            self.game = engine
+        if self.game is not None:
+            self.engine = self.game
+        else:
+            self.engine = random_engine(*self.generator_params, rng=self.rng)
+        # rows as separate arrays: indexing a list is cheaper than slicing an array for one step
+        self.moves = list(self.engine.move_matrix())
+        self.values = self.engine.values.copy()
+        self.observation = _read_only(self.values)
+        self.debt = self.engine.debt
+        self.steps = 0
+        return self.observation, {'debt': self.debt, 'bank': self.engine.bank}
+
+    def step(self, action):
+        np.add(self.values, self.moves[action], out=self.values)
+        debt, self.debt = self.debt, int(np.minimum(self.values, 0).sum())
+        self.steps += 1
+        terminated = self.debt == 0
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observation, self.debt - debt, terminated, truncated, {'debt': self.debt, 'steps': self.steps}
+
+
+class BatchDollarGameEnv:
+    '''
+    Many games with the same number of nodes stepped at once: values of shape (num_envs, n), one action per game.
+    Games that end (victory or max_steps) are reset to their initial values right away, as in Gym's vector
+    environments; the info of the step tells which ones did and how many steps they took
+    '''
+    def __init__(self, engines, num_envs=None, max_steps=200):
+        '''
+        :param engines - a game (all the environments play it) or a list of games, one per environment
+        :param num_envs - the number of environments if a single game is given
+        '''
+        # moves[env, action]: the change of the values (see LaplacianEngine.move_matrix)
+        if isinstance(engines, LaplacianEngine):
+            n = len(engines)
+            # the same game everywhere: the moves are only broadcast, not copied
+            self.moves = np.broadcast_to(engines.move_matrix(), (num_envs, 2 * n, n))
+            self.initial = np.broadcast_to(engines.values, (num_envs, len(engines))).copy()
+        else:
+            if len({len(engine) for engine in engines}) != 1:
+                raise ValueError('All the games of a batch must have the same number of nodes')
+            self.moves = np.stack([engine.move_matrix() for engine in engines])
+            self.initial = np.stack([engine.values for engine in engines])
+        self.num_envs, self.n = self.initial.shape
+        self.max_steps = max_steps
+        self.values = self.initial.copy()
+        self.observation = _read_only(self.values)
+        self.steps = np.zeros(self.num_envs, dtype=np.int64)
+        self._envs = np.arange(self.num_envs)
+
+    @property
+    def num_actions(self):
+        return 2 * self.n
+
+    def debt(self):
+        return np.minimum(self.values, 0).sum(axis=1)
+
+    def reset(self, seed=None):
+        self.values[:] = self.initial
+        self.steps[:] = 0
+        return self.observation, {'debt': self.debt()}
+
+    def step(self, actions):
+        debt = self.debt()
+        self.values += self.moves[self._envs, actions]
+        self.steps += 1
+        new_debt = self.debt()
+        terminated = new_debt == 0
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        done = terminated | truncated
+        info = {'debt': new_debt, 'steps': self.steps.copy(), 'done': done}
+        if done.any():
+            self.values[done] = self.initial[done]
+            self.steps[done] = 0
+        return self.observation, new_debt - debt, terminated, truncated, info
@@ -0,0 +1,184 @@
+'''
+Persistent cache of the best known solution of every game, shared by the game window and the commands.
+Games are keyed by a fingerprint of (edges, values) that ignores positions and node labels,
+so a game saved twice or with renumbered nodes hits the same entry.
+Entries only ever improve: a solver run replaces the stored firing vector only with a shorter one.
+'''
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import networkx as nx
+from networkx.algorithms.isomorphism import GraphMatcher
+
+from solvers import SolverResult
+
+
+SOLUTIONS_DIR = 'solutions'
+CACHE_CAPACITY = 128 # fingerprints kept in memory
+# statuses after which there is nothing left to look for
+FINAL_STATUSES = ('optimal', 'unwinnable')
+
+
+def fingerprint(engine):
+    '''
+    Weisfeiler-Lehman hash of the game: node colours start as the values and are refined with the sorted
+    colours of the neighbours until the partition is stable. Equal games (up to relabeling) get equal
+    fingerprints, different ones may rarely collide - the cache checks an isomorphism on top of it
+    '''
+    adjacency = engine.adjacency()
+    colors = engine.values.tolist()
+    history = [len(colors), len(engine.indices) // 2]
+    classes = len(set(colors))
+    for _ in range(len(colors)):
+        signatures = [(colors[i], tuple(sorted(colors[j] for j in adjacency[i]))) for i in range(len(colors))]
+        ids = {sig: k for k, sig in enumerate(sorted(set(signatures)))}
+        colors = [ids[sig] for sig in signatures]
+        history.append(sorted(signatures))
+        if len(ids) == classes:
+            break
+        classes = len(ids)
+    return hashlib.sha1(repr(history).encode()).hexdigest()
+
+
+def _edges(engine):
+    return sorted([i, j] for i, neig in enumerate(engine.adjacency()) for j in neig if i < j)
+
+
+def _as_graph(values, edges):
+    G = nx.Graph()
+    G.add_nodes_from((i, {'val': v}) for i, v in enumerate(values))
+    G.add_edges_from(edges)
+    return G
+
+
+def _match(entry, engine):
+    '''
+    Maps the stored node indices to the indices of engine, None if the entry is a different game
+    '''
+    values = engine.values.tolist()
+    edges = _edges(engine)
+    if entry['values'] == values and sorted(map(sorted, entry['edges'])) == edges:
+        return list(range(len(values)))
+    matcher = GraphMatcher(_as_graph(entry['values'], entry['edges']), _as_graph(values, edges),
+                           node_match=lambda a, b: a['val'] == b['val'])
+    if not matcher.is_isomorphic():
+        return None
+    return [matcher.mapping[i] for i in range(len(values))]
+
+
+def _to_result(entry, mapping, engine):
+    if entry['x'] is None:
+        return SolverResult(status=entry['status'], iterations=entry['iterations'], elapsed=entry['seconds'])
+    x = [0] * len(mapping)
+    for i, k in enumerate(entry['x']):
+        x[mapping[i]] = k
+    return SolverResult(engine.collapsed(x), entry['num_moves'], entry['status'],
+                        entry['iterations'], entry['seconds'], x)
+
+
+class SolutionCache:
+    '''
+    One json file per fingerprint on disk (a list of entries, in case of collisions)
+    with the most recently used files kept in memory
+    '''
+    def __init__(self, directory=SOLUTIONS_DIR, capacity=CACHE_CAPACITY):
+        self.directory = directory
+        self.capacity = capacity
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def _load(self, key):
+        # the solver worker writes from another process, the file time tells whether the memory copy is stale
+        path = self._path(key)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self._memory.pop(key, None)
+            return []
+        cached = self._memory.get(key)
+        if cached is not None and cached[0] == mtime:
+            self._memory.move_to_end(key)
+            return cached[1]
+        with open(path, 'r') as f:
+            entries = json.load(f)
+        self._remember_in_memory(key, mtime, entries)
+        return entries
+
+    def _remember_in_memory(self, key, mtime, entries):
+        self._memory[key] = (mtime, entries)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def get(self, engine):
+        '''
+        The cached best solution as a SolverResult in the node labels of engine, None if the game is unknown
+        '''
+        entries = self._load(fingerprint(engine))
+        for entry in entries:
+            mapping = _match(entry, engine)
+            if mapping is not None:
+                self.hits += 1
+                return _to_result(entry, mapping, engine)
+        self.misses += 1
+        return None
+
+    def put(self, engine, result, solver):
+        '''
+        Merges a finished solver run into the cache (keeps the shorter solution, adds up the effort)
+        and returns the best known result for the game
+        :param solver - the kind of solver that produced the result ('exact', 'random', ...)
+        '''
+        if result.status == 'running':
+            return result
+        key = fingerprint(engine)
+        # read the file even if it is in memory: another process might have improved it meanwhile
+        self._memory.pop(key, None)
+        entries = self._load(key)
+        for entry in entries:
+            mapping = _match(entry, engine)
+            if mapping is not None:
+                break
+        else:
+            entry = {'values': engine.values.tolist(), 'edges': _edges(engine), 'x': None, 'num_moves': None,
+                     'solver': solver, 'status': result.status, 'iterations': 0, 'seconds': 0.}
+            mapping = list(range(len(engine)))
+            entries.append(entry)
+        entry['iterations'] += result.iterations
+        entry['seconds'] += result.elapsed
+        if result.x is not None:
+            if entry['num_moves'] is None or result.num_moves < entry['num_moves']:
+                # stored in the node order of the entry
+                entry['x'] = [int(result.x[mapping[i]]) for i in range(len(mapping))]
+                entry['num_moves'] = int(result.num_moves)
+                entry['solver'] = solver
+                entry['status'] = result.status
+            elif result.num_moves == entry['num_moves'] and result.status == 'optimal':
+                entry['status'] = 'optimal'
+        elif result.status == 'unwinnable':
+            entry['status'] = 'unwinnable'
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(entries, f)
+        os.replace(path + '.tmp', path)
+        self._remember_in_memory(key, os.stat(path).st_mtime_ns, entries)
+        return _to_result(entry, mapping, engine)
+
+
+CACHE = SolutionCache()
+
+
+def lookup(engine):
+    return CACHE.get(engine)
+
+
+def remember(engine, result, solver):
+    return CACHE.put(engine, result, solver)
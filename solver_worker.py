@@ -0,0 +1,59 @@
+import multiprocessing
+import queue
+
+from solution_cache import remember
+from solvers import Budget, run_solver
+
+
+# a fresh interpreter only imports the solvers (no pygame), and does not share the window with the game
+CONTEXT = multiprocessing.get_context('spawn')
+
+
+def _run(engine, strategy, seconds, max_iterations, restarts, incumbent, use_cache, cancel_event, results):
+    budget = Budget(seconds, max_iterations, cancel_event)
+    result = run_solver(engine, strategy=strategy, restarts=restarts, budget=budget, on_progress=results.put,
+                        incumbent=incumbent)
+    if use_cache:
+        # also when cancelled: the window is gone by then, but the progress is kept for the next time
+        result = remember(engine, result, strategy)
+    results.put(result)
+
+
+class SolverWorker:
+    '''
+    Runs a bounded solver in a separate process so that the calling window keeps its frame rate
+    (a thread would compete with the main loop for the GIL). Partial results (status 'running')
+    and the final one are posted to a queue and picked up with poll().
+    '''
+    def __init__(self, engine, strategy='exact', seconds=None, max_iterations=None, restarts=10,
+                 incumbent=None, use_cache=False):
+        '''
+        :param engine - the game to solve; it is sent as a snapshot, so the caller may keep playing on the original
+        :param incumbent - a known firing vector to start from
+        :param use_cache - store the final result in the solution cache
+        '''
+        self.results = CONTEXT.Queue()
+        self.cancel_event = CONTEXT.Event()
+        self.done = False
+        self._process = CONTEXT.Process(
+            target=_run, daemon=True,
+            args=(engine, strategy, seconds, max_iterations, restarts, incumbent, use_cache, self.cancel_event,
+                  self.results))
+        self._process.start()
+
+    def poll(self):
+        '''
+        The most recent result posted since the last call, or None if there is nothing new
+        '''
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None and latest.is_final:
+            self.done = True
+        return latest
+
+    def cancel(self):
+        self.cancel_event.set()
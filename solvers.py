@@ -0,0 +1,647 @@
+'''
+Solvers working on the array representation of a game (engine.LaplacianEngine).
+A solution is a firing vector x (number of times each node gives, negative means takes),
+it is winning when values - L @ x >= 0 and its length in moves is sum |x_i|.
+'''
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import count
+from math import ceil, floor
+from time import perf_counter
+
+import numpy as np
+
+
+EPS = 1e-7
+# how many random firings are made between two budget checks (each check counts as an iteration)
+RANDOM_RUN_CHECK_EVERY = 2000
+BEAM_WIDTH = 8 # states kept per step by the 'beam' strategy
+BEAM_MAX_DEPTH = 10 # steps per node after which a beam run gives up
+# random runs seeding the exact solver: abandoned after that many firings per node, and started
+# only within that share of the time budget, so that the branch and bound gets the rest
+EXACT_SEED_STEPS = 2000
+EXACT_SEED_SHARE = 0.25
+ASTAR_WIDTH = 16 # states kept per layer by the 'astar' strategy
+ASTAR_MAX_STATES = 200000 # memory limit of the 'astar' strategy: states remembered (to skip repeated ones) and kept per layer
+ASTAR_LAYER_BYTES = 64 * 2**20 # and the most memory the look-ahead from one layer may take
+
+
+class Budget:
+    '''
+    Limits for a solver run: wall-clock seconds, a maximum number of iterations (random restarts and
+    every RANDOM_RUN_CHECK_EVERY firings within one, branch and bound nodes, A* layers)
+    and a cancellation token (anything with is_set(), e.g. threading.Event)
+    '''
+    def __init__(self, seconds=None, max_iterations=None, cancel=None):
+        self.start = perf_counter()
+        self.deadline = None if seconds is None else self.start + seconds
+        self.max_iterations = max_iterations
+        self.cancel = cancel
+        self.iterations = 0
+        self.status = None
+
+    def spend(self, iterations=1):
+        '''
+        Counts the iterations; returns False (and remembers why in self.status) once the budget is exhausted
+        '''
+        self.iterations += iterations
+        if self.status is None:
+            if self.cancel is not None and self.cancel.is_set():
+                self.status = 'cancelled'
+            elif self.max_iterations is not None and self.iterations >= self.max_iterations:
+                self.status = 'max_iterations'
+            elif self.deadline is not None and perf_counter() >= self.deadline:
+                self.status = 'timeout'
+        return self.status is None
+
+    @property
+    def elapsed(self):
+        return perf_counter() - self.start
+
+
+@dataclass
+class SolverResult:
+    '''
+    The best solution found so far; status is one of
+    'running' (partial progress), 'optimal' (proven), 'finished' (all random restarts done),
+    'timeout', 'max_iterations', 'cancelled' (budget exhausted) or 'unwinnable'
+    '''
+    moves: dict = None
+    num_moves: int = None
+    status: str = 'running'
+    iterations: int = 0
+    elapsed: float = 0.
+    x: list = None
+
+    @property
+    def is_final(self):
+        return self.status != 'running'
+
+
+def _pivot(T, basis, row, col):
+    T[row] /= T[row, col]
+    column = T[:, col].copy()
+    column[row] = 0
+    T -= np.outer(column, T[row])
+    basis[row] = col
+
+
+def _run_simplex(T, basis, cost):
+    # Bland's rule: the smallest improving column enters, ties in the ratio test go to the smallest basic index
+    while True:
+        reduced = cost[:-1] - cost[basis] @ T[:, :-1]
+        improving = np.flatnonzero(reduced < -EPS)
+        if not len(improving):
+            return True
+        col = improving[0]
+        rows = np.flatnonzero(T[:, col] > EPS)
+        if not len(rows):
+            return False
+        ratios = T[rows, -1] / T[rows, col]
+        candidates = rows[ratios <= ratios.min() + EPS]
+        _pivot(T, basis, candidates[np.argmin(basis[candidates])], col)
+
+
+def simplex(c, A, b):
+    '''
+    Two-phase dense simplex for: minimise c @ v subject to A @ v <= b, v >= 0.
+    Returns the optimal v, or None if the problem is infeasible (or unbounded).
+    '''
+    m, nv = A.shape
+    negative = b < 0
+    k = int(negative.sum())
+    T = np.zeros((m, nv + m + k + 1))
+    T[:, :nv] = A
+    T[:, nv:nv + m] = np.eye(m)
+    T[:, -1] = b
+    T[negative] *= -1
+    artificial = nv + m + np.arange(k)
+    T[np.flatnonzero(negative), artificial] = 1
+    basis = nv + np.arange(m)
+    basis[negative] = artificial
+
+    if k:
+        cost = np.zeros(nv + m + k + 1)
+        cost[artificial] = 1
+        _run_simplex(T, basis, cost)
+        if T[basis >= nv + m, -1].sum() > EPS:
+            return None
+        # degenerate artificials left in the basis are pivoted out (or their redundant rows dropped)
+        for row in np.flatnonzero(basis >= nv + m)[::-1]:
+            cols = np.flatnonzero(np.abs(T[row, :nv + m]) > EPS)
+            if len(cols):
+                _pivot(T, basis, row, cols[0])
+            else:
+                T = np.delete(T, row, axis=0)
+                basis = np.delete(basis, row)
+        T = np.delete(T, artificial, axis=1)
+
+    cost = np.zeros(nv + m + 1)
+    cost[:nv] = c
+    if not _run_simplex(T, basis, cost):
+        return None
+    v = np.zeros(nv + m)
+    v[basis] = T[:, -1]
+    return v[:nv]
+
+
+def relaxed_firing(L, values, lower, upper):
+    '''
+    LP relaxation of the minimum-move problem with bounds lower <= x <= upper (+-inf allowed):
+    x = p - q with p, q >= 0, minimise sum(p + q) s.t. L @ (p - q) <= values.
+    Returns the fractional optimum x, or None if the bounds make the game unwinnable.
+    '''
+    n = len(values)
+    eye = np.eye(n)
+    rows = [np.hstack([L, -L])]
+    rhs = [values.astype(float)]
+    has_upper = np.isfinite(upper)
+    has_lower = np.isfinite(lower)
+    if has_upper.any():
+        rows.append(np.hstack([eye, -eye])[has_upper])
+        rhs.append(upper[has_upper])
+    if has_lower.any():
+        rows.append(np.hstack([-eye, eye])[has_lower])
+        rhs.append(-lower[has_lower])
+    v = simplex(np.ones(2 * n), np.vstack(rows), np.concatenate(rhs))
+    if v is None:
+        return None
+    return v[:n] - v[n:]
+
+
+def optimal_firing(engine, incumbent, budget=None, on_improvement=None):
+    '''
+    Exact minimum-move firing vector: branch and bound over the LP relaxation.
+    :param incumbent - a known winning firing vector (bounds the search; returned if nothing shorter exists)
+    :param budget - one iteration per branch and bound node; the search stops early once it is exhausted
+    :param on_improvement - called with (x, number_of_moves) whenever a shorter vector is found
+    Returns (x, number_of_moves, proven) with x as a list. A complete search is exhaustive, so then
+    the result is optimal: every pruned branch has an LP bound of at least its number of moves.
+    '''
+    n = len(engine)
+    L = engine.dense_laplacian().astype(float)
+    values = engine.values
+    best = [list(map(int, incumbent)), sum(abs(int(t)) for t in incumbent)]
+
+    stack = [(np.full(n, -np.inf), np.full(n, np.inf))]
+    while stack:
+        if budget is not None and not budget.spend():
+            return best[0], best[1], False
+        lower, upper = stack.pop()
+        x = relaxed_firing(L, values, lower, upper)
+        if x is None or ceil(np.abs(x).sum() - EPS) >= best[1]:
+            continue
+        fractional = np.abs(x - np.round(x))
+        k = int(np.argmax(fractional))
+        if fractional[k] <= EPS:
+            x = np.round(x).astype(np.int64)
+            if (engine.outcome(x) >= 0).all():
+                best[0], best[1] = x.tolist(), int(np.abs(x).sum())
+                if on_improvement is not None:
+                    on_improvement(best[0], best[1])
+            continue
+        below, above = upper.copy(), lower.copy()
+        below[k] = floor(x[k])
+        above[k] = ceil(x[k])
+        # the branch closer to the relaxed value is explored first
+        if x[k] - floor(x[k]) < 0.5:
+            stack += [(above, upper), (lower, below)]
+        else:
+            stack += [(lower, below), (above, upper)]
+    return best[0], best[1], True
+
+
+def random_run(engine, budget=None, rng=random, max_steps=None):
+    '''
+    Random firing until victory: a random node in debt takes, a random node with a surplus gives.
+    :param rng - the source of randomness (random.Random for reproducible runs)
+    :param max_steps - the run is given up after about that many firings (checked with the budget)
+    Returns the collapsed firing vector as a list, or None if the budget ran out (or was cancelled)
+    or the steps did meanwhile
+    '''
+    # the scalar loop runs on python lists since numpy indexing dominates on graphs this small
+    values = engine.values.tolist()
+    degree = engine.degree.tolist()
+    adjacency = engine.adjacency()
+    debt = engine.debt
+    n = len(values)
+    x = [0] * n
+    steps = 0
+    randrange = rng.randrange
+    while debt:
+        steps += 1
+        if steps % RANDOM_RUN_CHECK_EVERY == 0:
+            if max_steps is not None and steps >= max_steps:
+                return None
+            # a long run counts against max_iterations too, not only once it is over
+            if budget is not None and not budget.spend():
+                return None
+        i = randrange(n)
+        v = values[i]
+        times = 1 if v > 0 else -1 if v < 0 else 0
+        if not times:
+            continue
+        x[i] += times
+        for j in adjacency[i]:
+            old = values[j]
+            values[j] = old + times
+            debt += min(old + times, 0) - min(old, 0)
+        values[i] = v - times * degree[i]
+        debt += min(values[i], 0) - min(v, 0)
+    return x
+
+
+def _single_moves(engine, rng):
+    '''
+    What the move-by-move solvers work with: the change of the values by every move (engine.move_matrix,
+    move m < n: node m gives, otherwise node m - n takes), the change of the firing vector at node m % n
+    and a numpy generator for random tie breaks drawn from rng
+    '''
+    return engine.move_matrix(), np.repeat([1, -1], len(engine)), np.random.default_rng(rng.randrange(2**32))
+
+
+def beam_run(engine, width=BEAM_WIDTH, budget=None, rng=random, max_depth=None):
+    '''
+    Beam search over single moves guided by the debt: every step looks ahead from all the states of the beam
+    at once (engine.move_debts) and keeps the `width` best distinct states never seen before - the least debt first,
+    then the fewest moves (collapsed), ties broken at random. width=1 is the greedy solver.
+    Returns the collapsed firing vector as a list of the first state without debt, or None if there is none
+    within max_depth steps (default BEAM_MAX_DEPTH per node) or the budget ran out
+    '''
+    n = len(engine)
+    max_depth = max_depth or BEAM_MAX_DEPTH * n
+    moves, signs, tiebreak = _single_moves(engine, rng)
+    if engine.debt == 0:
+        return [0] * n
+    V = engine.values[None, :].copy() # states of the beam as rows
+    X = np.zeros((1, n), dtype=np.int64)
+    seen = {V[0].tobytes()}
+    for _ in range(max_depth):
+        if budget is not None and not budget.spend(0):
+            return None
+        k = len(V)
+        # candidates are (state, move) pairs, move < n: node move gives, otherwise node move - n takes
+        debts = engine.move_debts(V.T).reshape(2 * n, k).T.ravel()
+        absolute = np.abs(X)
+        lengths = (absolute.sum(axis=1)[:, None] +
+                   np.hstack([np.abs(X + 1), np.abs(X - 1)]) - np.hstack([absolute, absolute])).ravel()
+        order = np.lexsort((tiebreak.random(2 * n * k), lengths, -debts))
+        states, firings = [], []
+        # the best candidates are expanded a few beams' worth at a time, most of them are usually taken
+        for chunk in range(0, len(order), 4 * width):
+            candidates = order[chunk:chunk + 4 * width]
+            w, move = np.divmod(candidates, 2 * n)
+            values = V[w] + moves[move]
+            x = X[w]
+            x[np.arange(len(x)), move % n] += signs[move]
+            for c in range(len(candidates)):
+                key = values[c].tobytes()
+                if key in seen:
+                    continue
+                seen.add(key)
+                if debts[candidates[c]] == 0:
+                    return x[c].tolist()
+                states.append(values[c])
+                firings.append(x[c])
+                if len(states) == width:
+                    break
+            if len(states) == width:
+                break
+        if not states:
+            return None
+        V, X = np.array(states), np.array(firings)
+    return None
+
+
+def debt_lower_bound(engine, values):
+    '''
+    Admissible estimate of the moves left to win from a state (values of shape (n,), or a batch (n, k) as in
+    engine.move_debts): a move gets a node at most deg dollars out of debt (taking) and the whole graph
+    at most max deg (giving to neighbours in debt). Returns the estimate and the debt (as a positive number)
+    '''
+    degree = engine.degree if values.ndim == 1 else engine.degree[:, None]
+    deficit = np.maximum(-values, 0)
+    debts = deficit.sum(axis=0)
+    # ceil is monotone, so it is taken once of the larger of the two ratios
+    bound = np.ceil(np.maximum(debts / engine.degree.max(), (deficit / degree).max(axis=0))).astype(np.int64)
+    return bound, debts
+
+
+def astar_run(engine, width=ASTAR_WIDTH, max_states=ASTAR_MAX_STATES, budget=None, rng=random, incumbent=None,
+              max_bytes=ASTAR_LAYER_BYTES):
+    '''
+    Best-first search over the states reachable by single moves, A*'s cost f = moves made + debt_lower_bound
+    expanded a layer (one more move) at a time. States are told apart by their values - a firing vector
+    and its shifts by a constant lead to the same one - so the moves to a state are the length of its cheapest
+    collapsed firing vector. Branches whose f reaches the best solution so far are cut: the bound is admissible,
+    so nothing shorter is lost by that.
+    :param width - beam width: states kept per layer, the lowest f first (then the least debt, ties at random);
+    'all' keeps all of them and makes the search exact
+    :param max_states - memory limit: the most states remembered to skip repeated ones (the remembered are dropped
+    past it) and kept per layer
+    :param max_bytes - memory limit of the look-ahead: a layer is cut to as many states as their children
+    (2n of them, n values each, with the temporaries of debt_lower_bound) fit in
+    :param budget - one iteration per layer
+    :param incumbent - a known winning firing vector, only shorter ones are searched for
+    Returns (x, proven): the shortest firing vector found as a list (None if none) and whether no layer was cut
+    short by the width or the memory limits and the budget lasted, which makes it optimal
+    '''
+    n = len(engine)
+    if engine.debt == 0:
+        return [0] * n, True
+    # the children take about four int64/float64 arrays of shape (n, 2n * layer)
+    fits = max(1, max_bytes // (4 * 8 * 2 * n * n))
+    width = min(max_states, fits) if width == 'all' else min(width, max_states, fits)
+    moves, signs, tiebreak = _single_moves(engine, rng)
+    best_x, best = None, float('inf')
+    if incumbent is not None:
+        best_x, best = list(incumbent), sum(map(abs, incumbent))
+    V = engine.values[:, None].copy() # the layer as columns
+    X = np.zeros((1, n), dtype=np.int64) # and its firing vectors as rows
+    seen = {engine.values.tobytes()}
+    proven = True
+    for g in count(1):
+        if budget is not None and not budget.spend():
+            return best_x, False
+        # child c is move c % 2n from state c // 2n of the layer
+        values = (V[:, :, None] + moves.T[:, None, :]).reshape(n, -1)
+        h, debts = debt_lower_bound(engine, values)
+        c = int(debts.argmin())
+        if debts[c] == 0 and g < best:
+            w, move = divmod(c, 2 * n)
+            best_x, best = X[w].tolist(), g
+            best_x[move % n] += int(signs[move])
+        # only children that might still lead to something shorter
+        candidates = np.flatnonzero(g + h < best)
+        # lowest f (all children are one move deeper, so lowest h), then the least debt, ties at random
+        rank = h[candidates] * float(2**32) + debts[candidates] + tiebreak.random(len(candidates))
+        order = candidates[np.argsort(rank)]
+        layer = []
+        for i, (c, state) in enumerate(zip(order.tolist(), values.T[order])):
+            key = state.tobytes()
+            if key in seen:
+                continue
+            seen.add(key)
+            layer.append(c)
+            if len(layer) == width:
+                # the rest of the candidates are not looked at
+                proven = proven and i == len(order) - 1
+                break
+        if not layer:
+            return best_x, proven
+        if len(seen) > max_states:
+            seen = {values[:, c].tobytes() for c in layer}
+        layer = np.array(layer)
+        w, move = np.divmod(layer, 2 * n)
+        V, X = values[:, layer], X[w]
+        X[np.arange(len(X)), move % n] += signs[move]
+
+
+def q_reduce(engine, q=0):
+    '''
+    Dhar's burning algorithm: the q-reduced divisor equivalent to the engine's values (connected graph assumed).
+    Returns (reduced, x) with reduced = values - L @ x as lists; the game is winnable iff reduced[q] >= 0,
+    and then x is a winning firing vector.
+    '''
+    n = len(engine)
+    adjacency = engine.adjacency()
+    values = engine.values.tolist()
+    x = [0] * n
+
+    # bfs layers around q
+    distance = [-1] * n
+    distance[q] = 0
+    layers = [[q]]
+    while True:
+        layer = []
+        for u in layers[-1]:
+            for w in adjacency[u]:
+                if distance[w] == -1:
+                    distance[w] = len(layers)
+                    layer.append(w)
+        if not layer:
+            break
+        layers.append(layer)
+
+    # get every node but q out of debt: from the outermost layer inwards, the ball inside
+    # a layer gives just enough times for that layer to be debt free (the debt moves towards q)
+    ball = [v for layer in layers for v in layer]
+    for k in range(len(layers) - 1, 0, -1):
+        times = 0
+        for v in layers[k]:
+            if values[v] < 0:
+                inner = sum(1 for u in adjacency[v] if distance[u] == k - 1)
+                times = max(times, -(values[v] // inner))
+        ball_size = len(ball) - len(layers[k])
+        del ball[ball_size:]
+        if not times:
+            continue
+        for u in ball:
+            x[u] += times
+            if distance[u] == k - 1:
+                for w in adjacency[u]:
+                    if distance[w] == k:
+                        values[u] -= times
+                        values[w] += times
+
+    # burn from q; whatever is left unburnt can give (as a set) without going into debt
+    while True:
+        burnt = [False] * n
+        burnt[q] = True
+        burnt_neighbours = [0] * n
+        queue = [q]
+        while queue:
+            u = queue.pop()
+            for w in adjacency[u]:
+                if not burnt[w]:
+                    burnt_neighbours[w] += 1
+                    if burnt_neighbours[w] > values[w]:
+                        burnt[w] = True
+                        queue.append(w)
+        unburnt = [v for v in range(n) if not burnt[v]]
+        if not unburnt:
+            return values, x
+        times = min(values[v] // burnt_neighbours[v] for v in unburnt if burnt_neighbours[v])
+        for v in unburnt:
+            x[v] += times
+            values[v] -= times * burnt_neighbours[v]
+            for w in adjacency[v]:
+                if burnt[w]:
+                    values[w] += times
+
+
+def is_connected(engine):
+    adjacency = engine.adjacency()
+    seen = [False] * len(engine)
+    seen[0] = True
+    queue = [0]
+    while queue:
+        for w in adjacency[queue.pop()]:
+            if not seen[w]:
+                seen[w] = True
+                queue.append(w)
+    return all(seen)
+
+
+def is_winnable(engine):
+    # exact; a disconnected graph is never a valid game, so it is reported as not winnable
+    if not len(engine) or engine.bank < 0 or not is_connected(engine):
+        return False
+    genus = len(engine.indices) // 2 - len(engine) + 1
+    if engine.bank >= genus:
+        return True
+    reduced, _ = q_reduce(engine)
+    return reduced[0] >= 0
+
+
+def cheapest_shift(x):
+    # x + c for any constant c is an equivalent firing vector, the median makes sum |x_i| the smallest
+    x = np.array(x, dtype=np.int64)
+    return (x - int(np.median(x))).tolist()
+
+
+def run_solver(engine, strategy='exact', restarts=10, budget=None, on_progress=None, rng=random, incumbent=None,
+               width=None, max_states=ASTAR_MAX_STATES):
+    '''
+    Bounded solver run.
+    :param strategy - 'random': the best of `restarts` random runs (None - as many as the budget allows);
+    'greedy' and 'beam': the same with beam_run (of width 1 and `width`) instead of random runs;
+    'astar': a single astar_run (beam width `width`, memory limit `max_states`) bounded by the witness
+    from Dhar's algorithm, restarts are not used;
+    'exact': a witness from Dhar's algorithm and up to `restarts` random runs (cut short, see EXACT_SEED_STEPS)
+    bound the exact branch and bound
+    :param budget - Budget limiting the run; with none the run is unbounded (winnable games always finish)
+    :param on_progress - called with a SolverResult (status 'running') whenever the best solution improves
+    :param rng - the source of randomness for the random runs
+    :param incumbent - a known winning firing vector (e.g. from an earlier run), the result is never worse
+    :param width - beam width, None for the default of the strategy (BEAM_WIDTH, ASTAR_WIDTH);
+    'all' makes 'astar' keep whole layers, so it proves its result optimal unless a memory limit or the budget is hit
+    Returns the final SolverResult: the best solution found plus the reason the run stopped.
+    '''
+    if budget is None:
+        budget = Budget()
+    result = SolverResult()
+
+    def finish(status):
+        result.status = status
+        result.iterations = budget.iterations
+        result.elapsed = budget.elapsed
+        return result
+
+    def improve(x, num_moves):
+        if result.num_moves is None or num_moves < result.num_moves:
+            result.x, result.num_moves = x, num_moves
+            result.moves = engine.collapsed(x)
+            if on_progress is not None:
+                on_progress(SolverResult(result.moves, num_moves, 'running', budget.iterations, budget.elapsed, x))
+
+    if not is_winnable(engine):
+        return finish('unwinnable')
+    if incumbent is not None:
+        improve(list(incumbent), sum(map(abs, incumbent)))
+    if strategy in ('exact', 'astar'):
+        # the witness bounds the search: nothing longer is looked at
+        x = cheapest_shift(q_reduce(engine)[1])
+        improve(x, sum(map(abs, x)))
+    elif strategy not in ('random', 'greedy', 'beam'):
+        raise KeyError('Unknown strategy:', strategy)
+
+    if strategy == 'astar':
+        x, proven = astar_run(engine, ASTAR_WIDTH if width is None else width, max_states, budget, rng, result.x)
+        if x is not None:
+            improve(x, sum(map(abs, x)))
+        if proven:
+            return finish('optimal')
+        restarts = 0
+
+    # for the exact solver the random runs are only a head start, they must leave it the time
+    seed_steps = seed_until = None
+    if strategy == 'exact':
+        seed_steps = EXACT_SEED_STEPS * len(engine)
+        if budget.deadline is not None:
+            seed_until = budget.start + EXACT_SEED_SHARE * (budget.deadline - budget.start)
+
+    for _ in (count() if restarts is None else range(restarts)):
+        if not budget.spend(0) or seed_until is not None and perf_counter() >= seed_until:
+            break
+        if strategy in ('greedy', 'beam'):
+            x = beam_run(engine, 1 if strategy == 'greedy' else BEAM_WIDTH if width is None else width, budget, rng)
+        else:
+            x = random_run(engine, budget, rng, seed_steps)
+        if x is None and budget.status is not None:
+            break
+        budget.spend()
+        if x is not None:
+            improve(x, sum(map(abs, x)))
+
+    if budget.status is None and strategy == 'exact':
+        x, num_moves, proven = optimal_firing(engine, result.x, budget, improve)
+        if proven:
+            return finish('optimal')
+    if result.x is None:
+        # the budget ran out before any random run finished, the witness is always at hand
+        x = cheapest_shift(q_reduce(engine)[1])
+        improve(x, sum(map(abs, x)))
+    return finish(budget.status or 'finished')
+
+
+# parallel runs: tasks go to spawned processes (no pygame there) and get the engine in its compact array form
+
+def _seeds(seed, k):
+    # independent, reproducible streams for the tasks
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(k)]
+
+
+def _executor(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _random_restarts_task(engine, restarts, seed):
+    rng = random.Random(seed)
+    best = None
+    for _ in range(restarts):
+        x = random_run(engine, rng=rng)
+        if best is None or sum(map(abs, x)) < sum(map(abs, best)):
+            best = x
+    return best
+
+
+def parallel_random_restarts(engine, restarts, workers=None, seed=None):
+    '''
+    The best of `restarts` random runs, split into one chunk per worker process (winnable games only).
+    Chunks are merged in order, so with a fixed seed the result does not depend on scheduling.
+    Returns the firing vector as a list.
+    '''
+    workers = workers or os.cpu_count()
+    chunks = [restarts // workers + (i < restarts % workers) for i in range(workers)]
+    chunks = [chunk for chunk in chunks if chunk]
+    with _executor(len(chunks)) as executor:
+        results = list(executor.map(_random_restarts_task, [engine] * len(chunks), chunks, _seeds(seed, len(chunks))))
+    return min(results, key=lambda x: sum(map(abs, x)))
+
+
+def _solve_task(engine, strategy, restarts, seconds, seed, incumbent):
+    return run_solver(engine, strategy=strategy, restarts=restarts, budget=Budget(seconds), rng=random.Random(seed),
+                      incumbent=incumbent)
+
+
+def solve_many(engines, strategy='exact', restarts=10, seconds=None, workers=None, seed=None, incumbents=None):
+    '''
+    run_solver for many games at once, one game per task spread over a pool of worker processes.
+    :param incumbents - known firing vectors (or None) for the games
+    Returns the SolverResults in the order of the engines.
+    '''
+    engines = list(engines)
+    if incumbents is None:
+        incumbents = [None] * len(engines)
+    args = (engines, [strategy] * len(engines), [restarts] * len(engines), [seconds] * len(engines),
+            _seeds(seed, len(engines)), incumbents)
+    workers = min(workers or os.cpu_count(), len(engines))
+    if workers <= 1:
+        # a pool would only add the start-up of the worker process
+        return list(map(_solve_task, *args))
+    with _executor(workers) as executor:
+        return list(executor.map(_solve_task, *args))
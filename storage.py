@@ -0,0 +1,233 @@
+'''
+Game store: all games in one SQLite file. Game definitions live in an indexed table together with
+a summary (play count, best score) that is kept up to date on every write, plays are only ever appended
+to a log table, so saving is O(1) regardless of the size of the library.
+Games keep the numbers (and the 'N.json' names) of the games/ folder layout, which remains
+the exchange format: see import_folder and export_folder.
+'''
+import json
+import os
+import sqlite3
+
+from move_codec import decode_moves, encode_moves, read_summary
+
+
+STORE_DIR = 'games.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    number INTEGER PRIMARY KEY,
+    graph TEXT NOT NULL,
+    info TEXT NOT NULL,
+    nodes INTEGER NOT NULL,
+    edges INTEGER NOT NULL,
+    bank INTEGER NOT NULL,
+    num_of_plays INTEGER NOT NULL DEFAULT 0,
+    best_play INTEGER,
+    best_score INTEGER,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS plays (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game INTEGER NOT NULL,
+    date_played TEXT NOT NULL,
+    num_moves INTEGER NOT NULL,
+    moves BLOB NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS plays_by_game ON plays (game);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY
+);
+'''
+
+
+def game_number(filename):
+    # cutting off the '.json' part
+    return int(filename[:-5])
+
+
+def game_filename(number):
+    return f'{number}.json'
+
+
+class GameStore:
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        for table in ('games', 'plays'):
+            columns = [row[1] for row in self.connection.execute(f'PRAGMA table_info({table})')]
+            if 'extra' not in columns:
+                # stores created before the column was added
+                with self.connection:
+                    self.connection.execute(f'ALTER TABLE {table} ADD COLUMN extra TEXT')
+
+    def is_empty(self):
+        return self.connection.execute('SELECT count(*) FROM games').fetchone()[0] == 0
+
+    def numbers(self):
+        return [row[0] for row in self.connection.execute('SELECT number FROM games ORDER BY number')]
+
+    def next_number(self):
+        return self.connection.execute('SELECT coalesce(max(number) + 1, 0) FROM games').fetchone()[0]
+
+    def exists(self, number):
+        return self.connection.execute('SELECT 1 FROM games WHERE number = ?', (number,)).fetchone() is not None
+
+    def add_game(self, graph, info, number=None, extra=None):
+        '''
+        Stores a game definition ({'edges', 'values', 'positions'} and info as in the game files)
+        under the next free number (or replaces game `number` with its plays); returns the number.
+        extra - any other top-level keys of a game file (e.g. 'state' of the oldest games), kept as they are
+        '''
+        with self.connection:
+            if number is None:
+                number = self.next_number()
+            else:
+                self.connection.execute('DELETE FROM plays WHERE game = ?', (number,))
+            self.connection.execute(
+                'INSERT OR REPLACE INTO games (number, graph, info, nodes, edges, bank, extra) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (number, json.dumps(graph), json.dumps(info), len(graph['values']), len(graph['edges']),
+                 sum(graph['values'].values()), json.dumps(extra) if extra else None))
+        return number
+
+    def game(self, number):
+        '''
+        {'graph': ..., 'info': ...} as in the game files (without the plays), None if there is no such game;
+        the other keys the game was imported with are under 'extra'
+        '''
+        row = self.connection.execute('SELECT graph, info, extra FROM games WHERE number = ?', (number,)).fetchone()
+        if row is None:
+            return None
+        return {'graph': json.loads(row[0]), 'info': json.loads(row[1]), 'extra': json.loads(row[2] or '{}')}
+
+    def append_play(self, number, date_played, moves, extra=None):
+        with self.connection:
+            play = self.connection.execute(
+                'INSERT INTO plays (game, date_played, num_moves, moves, extra) VALUES (?, ?, ?, ?, ?)',
+                (number, date_played, len(moves), encode_moves(moves), json.dumps(extra) if extra else None)).lastrowid
+            # the summary only needs the new play, not the whole log
+            self.connection.execute(
+                '''UPDATE games SET num_of_plays = num_of_plays + 1,
+                   best_play = CASE WHEN best_score IS NULL OR ? < best_score THEN ? ELSE best_play END,
+                   best_score = CASE WHEN best_score IS NULL OR ? < best_score THEN ? ELSE best_score END
+                   WHERE number = ?''',
+                (len(moves), play, len(moves), len(moves), number))
+
+    def plays(self, number):
+        return [{'date_played': date_played, 'moves': decode_moves(moves), **json.loads(extra or '{}')}
+                for date_played, moves, extra in self.connection.execute(
+                    'SELECT date_played, moves, extra FROM plays WHERE game = ? ORDER BY id', (number,))]
+
+    def _best_play_moves(self, number):
+        row = self.connection.execute(
+            'SELECT p.moves FROM games g JOIN plays p ON p.id = g.best_play WHERE g.number = ?', (number,)).fetchone()
+        return None if row is None else row[0]
+
+    def best_play(self, number):
+        '''
+        The moves of the shortest play (the earliest one among equals) and their number, (None, None) if never solved
+        '''
+        moves = self._best_play_moves(number)
+        if moves is None:
+            return None, None
+        moves = decode_moves(moves)
+        return moves, len(moves)
+
+    def best_play_collapsed(self, number):
+        '''
+        The collapsed moves of the shortest play and the number of moves in it, read from the header of the record
+        '''
+        moves = self._best_play_moves(number)
+        if moves is None:
+            return None, None
+        return read_summary(moves)
+
+    def summaries(self):
+        '''
+        One row per game for the game browser, read from the games table only
+        '''
+        return [{
+            'game_number': number,
+            'graph': (nodes, edges),
+            'bank': bank,
+            'num_of_plays': num_of_plays,
+            'best_score': best_score if best_score is not None else 'not solved',
+            'date_created': json.loads(info)['date_created'],
+        } for number, nodes, edges, bank, num_of_plays, best_score, info in self.connection.execute(
+            'SELECT number, nodes, edges, bank, num_of_plays, best_score, info FROM games')]
+
+    def reset(self, number):
+        '''
+        Erases the plays of a game, returns how many there were
+        '''
+        with self.connection:
+            deleted = self.connection.execute('DELETE FROM plays WHERE game = ?', (number,)).rowcount
+            self.connection.execute(
+                'UPDATE games SET num_of_plays = 0, best_play = NULL, best_score = NULL WHERE number = ?', (number,))
+        return deleted
+
+    def set_info(self, number, info):
+        with self.connection:
+            self.connection.execute('UPDATE games SET info = ? WHERE number = ?', (json.dumps(info), number))
+
+    def delete(self, number):
+        with self.connection:
+            self.connection.execute('DELETE FROM plays WHERE game = ?', (number,))
+            self.connection.execute('DELETE FROM games WHERE number = ?', (number,))
+
+    # the games/ folder layout: one 'N.json' file per game with its plays
+
+    def import_folder(self, directory, only_new=False):
+        '''
+        Adds the games of a folder in the games/ layout (replacing the ones with the same numbers),
+        returns how many were imported. Every file looked at is remembered.
+        only_new - only the files never looked at before whose numbers are free, so nothing in the store
+        is replaced and a deleted game does not come back from its file
+        '''
+        paths = {filename: os.path.abspath(os.path.join(directory, filename))
+                 for filename in os.listdir(directory) if filename.endswith('.json')}
+        filenames = list(paths)
+        if only_new:
+            known = {row[0] for row in self.connection.execute('SELECT path FROM imported_files')}
+            if not known and not self.is_empty():
+                # a store from before the files were remembered has seen the folder already
+                known = set(paths.values())
+            numbers = set(self.numbers())
+            filenames = []
+            for filename, path in paths.items():
+                if path in known:
+                    continue
+                if game_number(filename) in numbers:
+                    print(f'{path}: game #{game_number(filename)} exists, the file is left to the \'import\' command')
+                else:
+                    filenames.append(filename)
+        for filename in filenames:
+            with open(paths[filename], 'r') as f:
+                dat = json.load(f)
+            extra = {key: value for key, value in dat.items() if key not in ('graph', 'plays', 'info')}
+            number = self.add_game(dat['graph'], dat['info'], game_number(filename), extra)
+            for play in dat['plays']:
+                self.append_play(number, play['date_played'], play['moves'],
+                                 {key: value for key, value in play.items() if key not in ('date_played', 'moves')})
+        with self.connection:
+            self.connection.executemany('INSERT OR IGNORE INTO imported_files (path) VALUES (?)',
+                                        [(path,) for path in paths.values()])
+        return len(filenames)
+
+    def export_folder(self, directory):
+        '''
+        Writes every game with its plays as a file of the games/ layout, returns how many were exported.
+        A file holds the same data as the one the game was imported from, unknown keys (of the game and of
+        its plays) included,
+        but is written in json.dump's own format (hand-formatted files do not come back byte for byte)
+        '''
+        os.makedirs(directory, exist_ok=True)
+        numbers = self.numbers()
+        for number in numbers:
+            dat = self.game(number)
+            with open(os.path.join(directory, game_filename(number)), 'w') as f:
+                json.dump({'graph': dat['graph'], **dat['extra'], 'plays': self.plays(number), 'info': dat['info']}, f)
+        return len(numbers)
@@ -1,6 +1,7 @@
 import pygame
 from utils import THEME, PANEL_HEIGHT, FRAMERATE, OPTIONS
 import math
+from collections import OrderedDict
 from random import random, randint
 
 def hex_to_rgb(s):
@@ -14,6 +15,43 @@ def random_color():
     return rgb_to_hex((randint(0, 255),randint(0, 255),randint(0, 255)))
 
 
+class TextCache():
+    '''
+    Rendered text surfaces by (text, font, color), least recently used ones are dropped first.
+    Almost every label is the same from frame to frame, so font.render is only called for new ones
+    '''
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (text, font, tuple(color) if isinstance(color, list) else color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, False, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color):
+    return text_cache.render(font, text, color)
+
+
 class Button():
     def __init__(self, topleft, size, text, is_active=True, is_visible=True,
                  bg_color=THEME['button_default'], hover_text='this is helpful',  text_placement_specifier='default'):
@@ -62,8 +100,7 @@ class Button():
                 position = x + he//4, y + he//4
             else:
                 position = x + wi//8, y + he//4
-            screen.blit(font.render(self.text, False,
-                        THEME['def']), position)
+            screen.blit(render_text(font, self.text, THEME['def']), position)
 
     def cycle_color(self):
         # self.col = '#5750b3'
@@ -102,8 +139,7 @@ class Counter(Button):
         x, y = self.topleft
         wi, he = self.size
         pos = x + int(1.1*wi), y + he//4
-        screen.blit(font.render(str(self.value),
-                    False, THEME['counter_text']), pos)
+        screen.blit(render_text(font, str(self.value), THEME['counter_text']), pos)
         return super().draw(screen, font)
 
 
@@ -117,8 +153,7 @@ class HoverTooltip():
         for obj in self.objects:
             if obj.hovering(pos):
                 self.text = obj.hover_text
-                screen.blit(font.render(self.text, False,
-                            THEME['hover_text']), self.topleft)
+                screen.blit(render_text(font, self.text, THEME['hover_text']), self.topleft)
                 return
         self.text = ''
 
@@ -131,16 +166,16 @@ class Panel():
         x, y = topleft
         pygame.draw.rect(screen, THEME['open_game_panels'], [
                          x, y, 766, PANEL_HEIGHT], 4)
-        screen.blit(font.render(
-            str(self.data['game_number']), False, THEME['def']), (x+10, y+10))
-        screen.blit(font.render(
-            '/'.join(map(str, self.data['graph'])), False, THEME['def']), (x+130, y+10))
-        screen.blit(font.render(
-            str(self.data['num_of_plays']), False, THEME['def']), (x+270, y+10))
-        screen.blit(font.render(
-            str(self.data['best_score']), False, THEME['def']), (x+400, y+10))
-        screen.blit(font.render(
-            str(self.data['date_created']), False, THEME['def']), (x+560, y+10))
+        screen.blit(render_text(
+            font, str(self.data['game_number']), THEME['def']), (x+10, y+10))
+        screen.blit(render_text(
+            font, '/'.join(map(str, self.data['graph'])), THEME['def']), (x+130, y+10))
+        screen.blit(render_text(
+            font, str(self.data['num_of_plays']), THEME['def']), (x+270, y+10))
+        screen.blit(render_text(
+            font, str(self.data['best_score']), THEME['def']), (x+400, y+10))
+        screen.blit(render_text(
+            font, str(self.data['date_created']), THEME['def']), (x+560, y+10))
 
 
 class TextInput(Button):
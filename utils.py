@@ -7,8 +7,12 @@ from math import sqrt
 import numpy as np
 import pygame
 
+from storage import STORE_DIR, GameStore, game_filename, game_number
+
 
 FRAMERATE = 60
+IDLE_FRAMERATE = 10 # with partial_redraw on, once nothing has changed on the screen for IDLE_AFTER frames
+IDLE_AFTER = 30
 PANEL_HEIGHT = 50
 RECTS = [pygame.Rect([15, PANEL_HEIGHT + ind*(PANEL_HEIGHT + 4), 770, PANEL_HEIGHT])
          for ind in range(9)]
@@ -18,10 +22,12 @@ SORTBY_LIST = ['date_created', 'num_of_plays', 'best_score', 'game_number']
 LAYOUT_LIST = ['planar', 'shell']
 THEME_LIST = ['dark', 'light']
 ANIMATION_PATHS_LINGERING_TIME = 2 # in animation duration units
+ANIMATION_MAX_CURVES = 300 # paths on screen at once, the oldest ones go first
+SOLVER_TIME_BUDGET = 10 # seconds the background solver may spend on the best possible score of an opened game
 FONT_DIR = os.path.join('assets', 'UASQUARE.ttf')
 THEME_DIR = os.path.join('assets', 'theme.json')
 OPTIONS_DIR = os.path.join('assets', 'options.json')
-GAMES_DIR = 'games'
+GAMES_DIR = 'games' # the folder layout the game store imports from and exports to
 UPSCALE_POS_PREVIEW = np.array([140, 140], dtype=float)
 
 with open(OPTIONS_DIR, 'r') as f:
@@ -62,24 +68,36 @@ PYGAME_KEYS = {
 }
 
 
+_store = None
+
+
+def get_store():
+    '''
+    The game store; when it is created for the first time the games/ folder is imported into it,
+    later on only the files added to games/ since then (with numbers the store does not have yet) are;
+    deleted games stay deleted (use the 'import' command to replace games with the files of a folder)
+    '''
+    global _store
+    if _store is None:
+        first_time = not os.path.exists(STORE_DIR)
+        _store = GameStore(STORE_DIR)
+        if os.path.isdir(GAMES_DIR):
+            imported = _store.import_folder(GAMES_DIR, only_new=not first_time)
+            if imported and not first_time:
+                print(f'imported {imported} new game(s) from {GAMES_DIR}')
+    return _store
+
+
 def get_list_of_game_files():
-    if not os.path.isdir(GAMES_DIR):
-        os.mkdir(GAMES_DIR)
-    return [el for el in os.listdir(GAMES_DIR) if el.endswith('.json')]
+    return [game_filename(number) for number in get_store().numbers()]
 
 
 def get_next_game_number():
-    # cutting off the '.json' part
-    games_num = [int(el[:-5]) for el in get_list_of_game_files()]
-    if len(games_num) > 0:
-        return max(games_num) + 1
-    else:
-        return 0
+    return get_store().next_number()
 
 
 def pull_transform_positions_edges_from_gamefile(filename):
-    with open(os.path.join(GAMES_DIR, filename)) as f:
-        data = json.load(f)
+    data = get_store().game(game_number(filename))
     positions_raw = data['graph']['positions']
     pos = np.array(list(positions_raw.values()), dtype=float)
     pos -= np.min(pos, axis=0)
@@ -92,25 +110,7 @@ def pull_transform_positions_edges_from_gamefile(filename):
 
 
 def assemble_games_dataframe():
-    df = []
-    filenames = get_list_of_game_files()
-    for file in filenames:
-        with open(os.path.join(GAMES_DIR, file), 'r') as f:
-            dat = json.load(f)
-        data = {}
-        graph = dat['graph']
-        plays = dat['plays']
-        if len(plays):
-            best_score = min([len(play['moves']) for play in plays])
-        else:
-            best_score = 'not solved'
-        data['game_number'] = int(file[:-5])
-        data['graph'] = (len(graph['values']), len(graph['edges']))
-        data['bank'] = sum(graph['values'].values())
-        data['num_of_plays'] = len(plays)
-        data['best_score'] = best_score
-        data['date_created'] = dat['info']['date_created']
-        df.append(data)
+    df = get_store().summaries()
 
     if OPTIONS['sort_by'] == 'date_created':
         df.sort(key=lambda x: datetime.strptime(
@@ -126,18 +126,12 @@ def assemble_games_dataframe():
 
 
 def best_solution_by_player(filename):
-    with open(f'games/{filename}', 'r') as f:
-        game = json.load(f)
-        if game['plays']:
-            min_number_so_far = 1000000
-            best_play_so_far = None
-            for play in game['plays']:
-                if len(play['moves']) < min_number_so_far:
-                    min_number_so_far = len(play['moves'])
-                    best_play_so_far = play['moves']
-            return best_play_so_far, min_number_so_far
-        else:
-            return None, None
+    return get_store().best_play(game_number(filename))
+
+
+def best_collapsed_solution_by_player(filename):
+    # (collapsed moves, number of moves) without decoding the play
+    return get_store().best_play_collapsed(game_number(filename))
 
 
 def save_finished_game(g, moves, filename):
@@ -145,36 +139,22 @@ def save_finished_game(g, moves, filename):
         filename = save_new_game(g)
 
     dt_string = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    with open('games/' + filename, 'r') as fr:
-        dat = json.load(fr)
-    dat['plays'].append({
-        'date_played': dt_string,
-        'moves': moves
-    })
-    with open(f'games/{filename}', 'w') as fr:
-        json.dump(dat, fr)
+    get_store().append_play(game_number(filename), dt_string, moves)
     return filename
 
 
 def save_new_game(g):
-    n = get_next_game_number()
-    filename = f'{n}.json'
     dt_string = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    to_save = {
-        'graph': {
-            'edges': list(list(g.edges)),
-            'values': {node: g.nodes[node]['val'] for node in g.nodes},
-            'positions': {node: g.nodes[node]['pos'] for node in g.nodes}
-        },
-        'plays': [],
-        'info': {
-            'date_created': dt_string,
-            'note': ''
-        }
+    graph = {
+        'edges': list(list(g.edges)),
+        'values': {node: g.nodes[node]['val'] for node in g.nodes},
+        'positions': {node: g.nodes[node]['pos'] for node in g.nodes}
     }
-    with open(f'games/{filename}', 'w') as fr:
-        json.dump(to_save, fr)
-    return filename
+    info = {
+        'date_created': dt_string,
+        'note': ''
+    }
+    return game_filename(get_store().add_game(graph, info))
 
 
 def what_rect_hover(pos):
@@ -198,6 +178,57 @@ def dist(p1, p2):
     return sqrt((p1[1]-p2[1])**2 + (p1[0]-p2[0])**2)
 
 
+class SpatialHash:
+    '''
+    Uniform grid over the screen for point lookups: every key (node) sits in the cell of its position,
+    so a query only looks at the few cells its circle covers instead of at every key
+    '''
+    def __init__(self, cell_size=80):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.positions = {}
+
+    def _cell(self, pos):
+        return (int(pos[0] // self.cell_size), int(pos[1] // self.cell_size))
+
+    def insert(self, key, pos):
+        self.positions[key] = pos
+        self.cells.setdefault(self._cell(pos), set()).add(key)
+
+    def remove(self, key):
+        pos = self.positions.pop(key, None)
+        if pos is None:
+            return
+        cell = self._cell(pos)
+        self.cells[cell].discard(key)
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    def move(self, key, pos):
+        self.remove(key)
+        self.insert(key, pos)
+
+    def within(self, pos, radius):
+        '''
+        Keys closer than radius to pos
+        '''
+        x0, y0 = self._cell((pos[0] - radius, pos[1] - radius))
+        x1, y1 = self._cell((pos[0] + radius, pos[1] + radius))
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for key in self.cells.get((cx, cy), ()):
+                    if dist(pos, self.positions[key]) < radius:
+                        found.append(key)
+        return found
+
+    def nearest(self, pos, radius):
+        '''
+        The closest key within radius, None if there is none
+        '''
+        return min(self.within(pos, radius), key=lambda key: dist(pos, self.positions[key]), default=None)
+
+
 
 class Vec2:
     def __init__(self, x: float, y: float) -> None:
@@ -1 +1 @@
-from windows import game, menu, options, sandbox, open
\ No newline at end of file
+# the windows are imported where they are opened: the menu starts without graph and networkx (see menu.load_the_rest)
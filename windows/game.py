@@ -1,13 +1,16 @@
 from copy import deepcopy
 
 import pygame
-from graph import find_best, mouse_on_node, show_instruction, node_gives, node_takes
+from graph import mouse_on_node, show_instruction, node_gives, node_takes
 
 from utils import *
 from pygame_setup import *
 from ui_elements import Button, HoverTooltip, Panel, Counter, TextInput
 import animation
 from sfx import play_sfx
+from solver_worker import SolverWorker
+from solution_cache import FINAL_STATUSES, lookup
+from move_codec import MoveSequence
 
 
 
@@ -31,32 +34,37 @@ def GameWindow(g, filename=None):
         # in case an existing game is opened
         btn_save.is_active = False
         val = int(filename[:-5])
-        with open(os.path.join(GAMES_DIR, filename)) as f:
-            dat = json.load(f)
-        if len(dat['plays']) > 0:
-            best = min([len(play['moves']) for play in dat['plays']])
-        else:
-            best = None
+        _, best = best_collapsed_solution_by_player(filename)
 
     print(f'Game #{val}')
     running_game = True
     is_victory = False
     only_once = True
     show_best_moves = False
-    moves = []
+    moves = MoveSequence()
     g_not_solved = deepcopy(g)
-    once = True
 
     anim = animation.Animation()
     moves_best = None
+    solver = None
+    if OPTIONS['show_best_possible']:
+        # a known solution shows up at once, the background solver only works on improving it
+        cached = lookup(g.engine)
+        if cached is not None and cached.moves is not None:
+            moves_best, min_num_moves = cached.moves, cached.num_moves
+            best_is_optimal = cached.status == 'optimal'
+        if cached is None or cached.status not in FINAL_STATUSES:
+            solver = SolverWorker(g.engine, seconds=SOLVER_TIME_BUDGET, use_cache=True,
+                                  incumbent=None if cached is None else cached.x)
 
     kb_controls = -1; prev_node_index = None
 
 
     while running_game:
         screen.fill(THEME['background'])
-        dt = clock.tick(FRAMERATE)
+        dt = renderer.tick(clock)
         for event in pygame.event.get():
+            profiler_hotkeys(event)
             if event.type == pygame.MOUSEBUTTONDOWN:
                 down = pygame.mouse.get_pos()
             elif event.type == pygame.MOUSEBUTTONUP:
@@ -153,23 +161,38 @@ def GameWindow(g, filename=None):
             play_sfx('victory')
             btn_save.is_active = True
             only_once = False
+        profiler.lap('events')
 
         btn_save.draw(screen, my_font)
         btn_back.draw(screen, my_font)
         mouse = pygame.mouse.get_pos()
         _, on_node = mouse_on_node(g, mouse)
         hover.display(mouse, screen, my_font_hover)
+        profiler.lap('buttons')
         display_prev_stats(val, best)
         display_nodes_edges(g, on_node)
+        profiler.lap('nodes_edges')
         display_labels(g, sandbox=False, num_moves=len(moves))
+        profiler.lap('labels')
         anim.draw(screen)
         anim.tick()
+        profiler.lap('animation')
         
         blit(f'[{kb_controls if kb_controls != -1 else (prev_node_index if prev_node_index is not None else "")}]', (10, HEIGHT-24), '#FFFFFF')
         
+        if solver is not None and not solver.done:
+            result = solver.poll()
+            if result is not None and result.moves is not None:
+                moves_best, min_num_moves = result.moves, result.num_moves
+                best_is_optimal = result.status == 'optimal'
+                if result.is_final:
+                    # output optimal strategy to the console
+                    print(', '.join(show_instruction(moves_best)))
+        profiler.lap('solver')
+
         if moves_best is not None and OPTIONS['show_best_possible']:
             btn_best.draw(screen, my_font)
-            blit(f'best possible', (20, 157), YELLOW)
+            blit('best possible' if best_is_optimal else 'best found', (20, 157), YELLOW)
             blit(f'score: {min_num_moves}', (20, 175), YELLOW)
             if show_best_moves:
                 for i, hint in enumerate(show_instruction(moves_best)):
@@ -181,10 +204,7 @@ def GameWindow(g, filename=None):
         # play field
         pygame.draw.rect(screen, THEME['field_outline'], [
                          WIDTH*0.2, 4, WIDTH*0.8-4, HEIGHT-8], 2)
-        pygame.display.update()
+        renderer.update()
 
-        if once and OPTIONS['show_best_possible']:
-                moves_best, min_num_moves = find_best(g, N=100)
-                # output optimal strategy to the console
-                print(', '.join(show_instruction(moves_best)))
-                once = False
+    if solver is not None:
+        solver.cancel()
@@ -1,13 +1,20 @@
+from threading import Thread
+
 import pygame
-from sfx import play_sfx
+from sfx import play_sfx, preload_sfx
 
 from utils import *
 from pygame_setup import *
 from ui_elements import Button, HoverTooltip
 
-from windows.options import OptionsWindow
-from windows.sandbox import SandboxWindow
-from windows.open import OpenGameWindow
+
+def load_the_rest():
+    '''
+    Everything the menu itself does not need: the other windows (with graph, networkx and the solvers)
+    and the most used sound effects. Run in the background once the menu is on the screen
+    '''
+    import windows.options, windows.sandbox, windows.open
+    preload_sfx()
 
 
 
@@ -27,11 +34,13 @@ def MenuWindow():
     btns = [btn_options, btn_create, btn_open, btn_exit]
     hover = HoverTooltip(objects=btns)
     clock = pygame.time.Clock()
+    loader = None
 
     running_menu = True
     while running_menu:
         screen.fill(THEME['background'])
         for event in pygame.event.get():
+            profiler_hotkeys(event)
             if event.type == pygame.MOUSEBUTTONDOWN:
                 down = pygame.mouse.get_pos()
             elif event.type == pygame.MOUSEBUTTONUP:
@@ -39,6 +48,7 @@ def MenuWindow():
                 if event.button == 1:
                     if btn_options.hovering(up):
                         play_sfx('click')
+                        from windows.options import OptionsWindow
                         OptionsWindow()
                         pygame.display.set_caption('Menu')
                     elif btn_exit.hovering(up):
@@ -47,23 +57,31 @@ def MenuWindow():
                         # pygame.quit()
                     elif btn_create.hovering(up):
                         play_sfx('click')
+                        from windows.sandbox import SandboxWindow
                         SandboxWindow()
                         pygame.display.set_caption('Menu')
                     elif btn_open.hovering(up):
                         play_sfx('click')
+                        from windows.open import OpenGameWindow
                         OpenGameWindow()
                         pygame.display.set_caption('Menu')
             elif event.type == pygame.QUIT:
                 running_menu = False
 
+        profiler.lap('events')
+
         for obj in btns:
             obj.draw(screen, my_font)
 
         # hover tooltips
         mouse = pygame.mouse.get_pos()
         hover.display(mouse, screen, my_font_hover)
+        profiler.lap('buttons')
 
         # white outline
         pygame.draw.rect(screen, THEME['def'], [0, 0, WIDTH, HEIGHT], 4)
-        pygame.display.update()
-        clock.tick(FRAMERATE)
\ No newline at end of file
+        renderer.update()
+        if loader is None:
+            loader = Thread(target=load_the_rest, daemon=True)
+            loader.start()
+        renderer.tick(clock)
\ No newline at end of file
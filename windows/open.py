@@ -31,6 +31,7 @@ def OpenGameWindow():
     while running_opengame:
         screen.fill(THEME['background'])
         for event in pygame.event.get():
+            profiler_hotkeys(event)
             if event.type == pygame.MOUSEBUTTONDOWN:
                 down = pygame.mouse.get_pos()
             elif event.type == pygame.MOUSEBUTTONUP:
@@ -94,6 +95,7 @@ def OpenGameWindow():
                     elif event.key == pygame.K_ESCAPE:
                         kb_controls = -1
                 existing_game_file = f'{kb_controls}.json' in GAME_FILES
+        profiler.lap('events')
                     
 
         if update:
@@ -103,11 +105,13 @@ def OpenGameWindow():
             start, finish = 0, 9
             panels9 = panels[start:finish]
             update = False
+        profiler.lap('games')
 
         btn_back.draw(screen, my_font)
         btn_randomgame.draw(screen, my_font)
         btn_shiftdown.draw(screen, my_font)
         btn_shiftup.draw(screen, my_font)
+        profiler.lap('buttons')
 
         display_panels(panels9)
         blit('Game #', (15+10, 15), THEME['def'])
@@ -118,6 +122,7 @@ def OpenGameWindow():
         blit(f'{kb_controls if kb_controls != -1 else ""}', (608, 562), GREEN if existing_game_file else RED)
         
         pygame.draw.rect(screen, THEME['def'], [10, 10, 780, 530], 4)
+        profiler.lap('panels')
 
         if mouse and pygame.key.get_mods() & pygame.KMOD_SHIFT:
             panel_number = what_rect_hover(mouse)
@@ -131,13 +136,15 @@ def OpenGameWindow():
                     games_previews_cache[game_number] = graph_to_display
                 
                 display_graph_preview(*graph_to_display, current_mouse_pos=np.array(mouse, dtype=float))        
+        profiler.lap('preview')
 
         # hover tooltips
         mouse = pygame.mouse.get_pos()
         hover.display(mouse, screen, my_font_hover)
+        profiler.lap('buttons')
 
-        pygame.display.update()
-        clock.tick(FRAMERATE)
+        renderer.update()
+        renderer.tick(clock)
 
 
 
@@ -5,7 +5,7 @@ import pygame
 from utils import *
 from pygame_setup import *
 from commands import Commands
-from ui_elements import Button, HoverTooltip, Panel, Counter, TextInput
+from ui_elements import Button, HoverTooltip, Panel, Counter, TextInput, render_text
 from sfx import bg_music_set_vol, play_bg_music, play_sfx, set_sfx_volume
 
 
@@ -41,13 +41,15 @@ def OptionsWindow():
                         text='Next', hover_text='switch backgroung music track')
     cnt_sfx_volume = Counter(topleft=(10, 410), size=(110, 40), value=OPTIONS['sfx_volume'], bounds=(0, 100),
                             text='SFX', hover_text='sound effects volume')
+    btn_partial_redraw = Button(topleft=(10, 455), size=(120, 40),
+                        text='Redraw', hover_text='only redraw what changed, slow down when idle (saves power)')
     txt_console = TextInput(topleft=(330, 10), size=(460, 40),
                         text='', hover_text=f'this is the command line', text_placement_specifier='input_text')
     objects = [
         btn_back, btn_save, btn_show_ind,
         btn_sort_by, btn_layout, btn_show_best_possible, 
         txt_console, btn_theme, btn_wiggle, btn_bezier_animation, 
-        cnt_bg_music_volume, cnt_sfx_volume, btn_next_bg_track
+        cnt_bg_music_volume, cnt_sfx_volume, btn_next_bg_track, btn_partial_redraw
     ]
     hover = HoverTooltip(objects=objects, topleft=(130, 567))
 
@@ -55,6 +57,7 @@ def OptionsWindow():
     while running_options:
         screen.fill(THEME['background'])
         for event in pygame.event.get():
+            profiler_hotkeys(event)
             if event.type == pygame.MOUSEBUTTONDOWN:
                 down = pygame.mouse.get_pos()
                 txt_console.input_mode = False
@@ -95,6 +98,9 @@ def OptionsWindow():
                     elif btn_bezier_animation.hovering(up):
                         OPTIONS['bezier_animation'] = not OPTIONS['bezier_animation']
                         play_sfx('options_switch')
+                    elif btn_partial_redraw.hovering(up):
+                        OPTIONS['partial_redraw'] = not OPTIONS['partial_redraw']
+                        play_sfx('options_switch')
                     elif btn_next_bg_track.hovering(up):
                         play_bg_music()
                         play_sfx('options_switch')
@@ -148,6 +154,7 @@ def OptionsWindow():
                     txt_console.input_mode = True
             elif event.type == pygame.QUIT:
                 running_options = False
+        profiler.lap('events')
 
         for obj in objects:
             obj.draw(screen, my_font)
@@ -155,6 +162,7 @@ def OptionsWindow():
         # hover tooltips
         mouse = pygame.mouse.get_pos()
         hover.display(mouse, screen, my_font_hover)
+        profiler.lap('buttons')
 
         # some text
         x, y = btn_show_ind.topleft  
@@ -165,6 +173,7 @@ def OptionsWindow():
         blit(OPTIONS['theme'], (x + btn_show_ind.size[0] + 5, y + 210), THEME['def'])
         blit(str(OPTIONS['wiggle']), (x + btn_show_ind.size[0] + 5, y + 260), GREEN if OPTIONS['wiggle'] else RED)
         blit(str(OPTIONS['bezier_animation']), (x + btn_show_ind.size[0] + 5, y + 310), GREEN if OPTIONS['bezier_animation'] else RED)
+        blit('partial' if OPTIONS['partial_redraw'] else 'full', (x + btn_show_ind.size[0] + 5, y + 455), GREEN if OPTIONS['partial_redraw'] else THEME['def'])
 
         # light yellow outline
         pygame.draw.rect(screen, THEME['options_outline'], [
@@ -172,7 +181,8 @@ def OptionsWindow():
         # console logs
         pygame.draw.rect(screen, THEME['def'], [330, 60, 460, 530], 4)
         for i, log in enumerate(cmdline.console_log[-22:]):
-            screen.blit(my_font.render(log, False, THEME['def']),
+            screen.blit(render_text(my_font, log, THEME['def']),
                         (337, 65 + i*23))
-        pygame.display.update()
-        clock.tick(FRAMERATE)
+        profiler.lap('console')
+        renderer.update()
+        renderer.tick(clock)
@@ -4,7 +4,7 @@ import pygame
 
 from utils import *
 from pygame_setup import *
-from graph import DGGraph, create_edge, create_node, decrease_value, far_enough_from_nodes, generate_game, increase_value, mouse_on_node, remove_edge, remove_node
+from graph import DGGraph, create_edge, create_node, decrease_value, far_enough_from_nodes, generate_game, increase_value, is_game_valid, mouse_on_node, remove_edge, remove_node
 from ui_elements import Button, HoverTooltip, Panel, Counter, TextInput
 from sfx import play_sfx
 from windows.game import GameWindow
@@ -43,6 +43,7 @@ def SandboxWindow():
     while running:
         screen.fill(THEME['background'])
         for event in pygame.event.get():
+            profiler_hotkeys(event)
             if not pygame.key.get_mods() & pygame.KMOD_SHIFT:
                 holding_with_shift = False # fixed issue #4
                 if event.type == pygame.MOUSEBUTTONDOWN:
@@ -118,12 +119,16 @@ def SandboxWindow():
                 elif event.type == pygame.MOUSEBUTTONUP:
                     holding_with_shift = False
 
+        profiler.lap('events')
+
         # moving the nodes
         if holding_with_shift and down_bool_shift:
-            G.nodes[node_down_shift]['pos'] = pygame.mouse.get_pos()
+            G.move_node(node_down_shift, pygame.mouse.get_pos())
 
         display_nodes_edges(G, None)
+        profiler.lap('nodes_edges')
         display_labels(G, sandbox=True)
+        profiler.lap('labels')
 
         # aesthetics (when drawing edges)
         if holding_down:
@@ -141,18 +146,20 @@ def SandboxWindow():
                                      G.nodes[node_down]['pos'], pos, 2)
 
         btn_proceed.is_active = is_game_valid(G)
+        profiler.lap('other')
         for obj in objects:
             obj.draw(screen, my_font)
 
         # hover tooltips
         mouse = pygame.mouse.get_pos()
         hover.display(mouse, screen, my_font_hover)
+        profiler.lap('buttons')
 
         # purple outline
         pygame.draw.rect(screen, (213, 88, 251), [0, 0, WIDTH, HEIGHT], 4)
         # sandbox field
         pygame.draw.rect(screen, THEME['field_outline'], [
             WIDTH*0.2, 4, WIDTH*0.8-4, HEIGHT-8], 2)
-        pygame.display.update()
-        clock.tick(FRAMERATE)
+        renderer.update()
+        renderer.tick(clock)
 